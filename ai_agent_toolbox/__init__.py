@@ -1,19 +1,35 @@
-from .toolbox import Toolbox, ToolConflictError, ToolArgumentError
+from .toolbox import Toolbox, ToolConflictError, ToolArgumentError, ToolTimeoutError
 from .tool_parser import ToolParseError
 from .xml_parser import XMLParser
+from .batch import parse_many
+from .files import iter_file_events, parse_file
 from .xml_prompt_formatter import XMLPromptFormatter
-from .parser_event import ParserEvent
+from .parser_event import EventMode, EventType, ParserEvent
 from .tool_use import ToolUse
+from .spilled_arg import SpilledArg
+from .arg_span import ArgSpan
+from .parser_stats import ParserStats
+from .tool_limiter import ToolLimitStats
 from .tool_response import ToolResponse
 
 __all__ = [
     "Toolbox",
     "ToolConflictError",
     "ToolArgumentError",
+    "ToolTimeoutError",
     "ToolParseError",
     "ParserEvent",
+    "EventType",
+    "EventMode",
     "ToolUse",
+    "SpilledArg",
+    "ArgSpan",
+    "ParserStats",
+    "ToolLimitStats",
     "ToolResponse",
     "XMLParser",
+    "parse_many",
+    "parse_file",
+    "iter_file_events",
     "XMLPromptFormatter",
 ]
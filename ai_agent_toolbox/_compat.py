@@ -0,0 +1,7 @@
+"""Python version compatibility helpers."""
+
+import sys
+
+# ``@dataclass(**DATACLASS_SLOTS)`` gives instances ``__slots__`` instead of a
+# per-instance ``__dict__`` where supported (Python 3.10+).
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
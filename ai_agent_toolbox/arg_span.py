@@ -0,0 +1,46 @@
+"""Tool argument values that refer to the parsed text instead of copying it."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class ArgSpan:
+    """A tool argument value as a span ``source[start:end]`` of the parsed text.
+
+    :class:`~ai_agent_toolbox.XMLParser` produces these in ``ToolUse.args``
+    with ``lazy_args=True``. No characters are copied until the value is
+    turned into a ``str`` with ``str()``; ``len()`` and comparison with a
+    ``str`` work on the source directly. Pickling (e.g. to another process)
+    produces a plain ``str``.
+    """
+
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source: str, start: int, end: int) -> None:
+        self.source = source
+        self.start = start
+        self.end = end
+
+    def __str__(self) -> str:
+        return self.source[self.start:self.end]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ArgSpan):
+            other = str(other)
+        if isinstance(other, str):
+            return len(other) == self.end - self.start and self.source.startswith(other, self.start)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Equal to the str it stands for, so it must hash like it
+        return hash(str(self))
+
+    def __reduce__(self) -> Any:
+        return (str, (str(self),))
+
+    def __repr__(self) -> str:
+        return f"ArgSpan(start={self.start}, end={self.end})"
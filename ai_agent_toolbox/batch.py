@@ -0,0 +1,289 @@
+"""Parse complete documents across a process pool."""
+
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ai_agent_toolbox.parser_event import EventMode, EventType, ParserEvent
+from ai_agent_toolbox.parser_utils import IdFactory, counter_id_factory
+from ai_agent_toolbox.tool_parser import ToolParseError
+from ai_agent_toolbox.tool_use import ToolUse
+from ai_agent_toolbox.xml_parser import XMLParser
+
+OUTPUTS = ("events", "tool_uses")
+
+# Batches per worker, so uneven documents still spread across the pool
+_BATCHES_PER_WORKER = 4
+
+# Smallest default segment for parse_parallel; below this, pickling the
+# segment and its events costs more than parsing it
+_MIN_SEGMENT_CHARS = 1 << 16
+
+_TYPES = {kind.value: kind for kind in EventType}
+_MODES = {mode.value: mode for mode in EventMode}
+
+# Events travel between processes as plain tuples:
+# (type, mode, id, content, tag, (tool name, args, arg offsets) or None, start, end)
+_EncodedTool = Tuple[str, Dict[str, Any], Dict[str, Tuple[int, int]]]
+_EncodedEvent = Tuple[
+    str, str, str, Optional[str], Optional[str], Optional[_EncodedTool], Optional[int], Optional[int]
+]
+
+# (events, ids drawn, ended at a top-level tool start, dropped a nameless tool,
+# parse error)
+_SegmentResult = Tuple[List[_EncodedEvent], int, bool, bool, Optional[ToolParseError]]
+
+
+def parse_many(
+    texts: Iterable[str],
+    workers: Optional[int] = None,
+    output: str = "events",
+    chunksize: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    **parser_options: Any,
+) -> Union[List[List[ParserEvent]], List[List[ToolUse]]]:
+    """Parse each text with a fresh :class:`XMLParser`, in parallel.
+
+    Texts are sent to worker processes in batches of ``chunksize`` and results
+    come back in input order, one list per text. ``output="tool_uses"``
+    returns only the closed tool calls of each text and skips building text
+    and block events in the workers. Results cross the process boundary as
+    plain tuples, which pickle far smaller than event objects.
+
+    Args:
+        texts: Complete documents to parse.
+        workers: Number of processes (default: CPU count). With one worker,
+            or a single text, everything runs in this process.
+        output: ``"events"`` for full event lists or ``"tool_uses"``.
+        chunksize: Texts per submitted batch (default: enough for about four
+            batches per worker).
+        executor: An existing executor to submit to, e.g. a long-lived
+            ``ProcessPoolExecutor`` reused across calls. ``workers`` then only
+            sets the default ``chunksize``.
+        **parser_options: Passed to :class:`XMLParser`, e.g. ``tag``. They must
+            be picklable.
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output {output!r}; expected one of {OUTPUTS}")
+    texts = list(texts)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if output == "tool_uses":
+        parser_options.setdefault("event_types", (EventType.TOOL.value,))
+
+    if executor is None and (workers == 1 or len(texts) <= 1):
+        if output == "tool_uses":
+            return [_tool_uses(XMLParser(**parser_options).parse(text)) for text in texts]
+        return [XMLParser(**parser_options).parse(text) for text in texts]
+
+    if chunksize is None:
+        chunksize = -(-len(texts) // (workers * _BATCHES_PER_WORKER)) or 1
+    batches = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    work = partial(_parse_batch, output=output, parser_options=parser_options)
+
+    if executor is not None:
+        encoded = list(executor.map(work, batches))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            encoded = list(pool.map(work, batches))
+
+    if output == "tool_uses":
+        return [
+            [ToolUse(name, args, offsets) for name, args, offsets in tools]
+            for batch in encoded
+            for tools in batch
+        ]
+    return [[_decode(event) for event in events] for batch in encoded for events in batch]
+
+
+def parse_parallel(
+    text: str,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    segment_chars: Optional[int] = None,
+    id_factory: Optional[IdFactory] = None,
+    **parser_options: Any,
+) -> List[ParserEvent]:
+    """Parse one complete document in parallel.
+
+    The result is exactly ``XMLParser(id_factory=id_factory,
+    **parser_options).parse(text)``, ids included. The document is cut just
+    before a tool start tag roughly every ``segment_chars`` characters, and the
+    segments are parsed in worker processes. Each worker also reads the start
+    tag of the next segment, and reports whether it ended up entering a tool
+    there; a cut where it did not (the tag was inside a block, a tool argument
+    or an unclosed tool) is undone by parsing the two segments as one. Ids are
+    drawn in the workers as placeholders and replaced afterwards, in order,
+    from ``id_factory``.
+
+    Args:
+        text: The complete document.
+        workers: Number of processes (default: CPU count).
+        executor: An existing executor to submit segments to.
+        segment_chars: Target segment length (default: about four segments
+            per worker, at least 64 KiB).
+        id_factory: Id factory for the result (default: a new counter).
+        **parser_options: Passed to :class:`XMLParser`; must be picklable.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if id_factory is None:
+        id_factory = counter_id_factory()
+    if segment_chars is None:
+        segment_chars = max(len(text) // (workers * _BATCHES_PER_WORKER), _MIN_SEGMENT_CHARS)
+
+    start_tag = f"<{parser_options.get('tag', 'tool')}>"
+    cuts = _segment_cuts(text, start_tag, segment_chars)
+    if not cuts or (executor is None and workers == 1):
+        return XMLParser(id_factory=id_factory, **parser_options).parse(text)
+
+    bounds = [0, *cuts, len(text)]
+    segments = [text[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+    lookaheads = [start_tag] * len(cuts) + [None]
+    work = partial(_parse_segment, parser_options=parser_options)
+
+    if executor is not None:
+        results = list(executor.map(work, segments, lookaheads))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(segments))) as pool:
+            results = list(pool.map(work, segments, lookaheads))
+
+    def valid(result: _SegmentResult, end: int) -> bool:
+        _, _, at_tool, nameless, error = result
+        if error is not None:
+            # Raised by text inside the segment, so a sequential parse that
+            # gets this far raises it too
+            return True
+        # A tool block ending without a <name> takes the next <name> in the
+        # document instead, so it is only discarded if there is none
+        return at_tool and not (nameless and text.find("<name>", end) != -1)
+
+    events: List[ParserEvent] = []
+    index = 0
+    while index < len(segments):
+        first = index
+        result = results[index]
+        merged = segments[index]
+        while not valid(result, bounds[index + 1]):
+            # The cut after this segment was not at a top-level tool; parse
+            # across it here
+            index += 1
+            merged += segments[index]
+            result = _parse_segment(merged, lookaheads[index], parser_options)
+        encoded, draws, _, _, error = result
+        if error is not None:
+            raise error
+        ids = [id_factory() for _ in range(draws)]
+        # Offsets in the segment are relative to where it starts
+        base = bounds[first]
+        events.extend(_decode(event, ids, base) for event in encoded)
+        index += 1
+    return events
+
+
+def _segment_cuts(text: str, start_tag: str, segment_chars: int) -> List[int]:
+    """Return the start tag positions nearest after each multiple of ``segment_chars``."""
+    cuts = []
+    target = segment_chars
+    while target < len(text):
+        cut = text.find(start_tag, target)
+        if cut == -1:
+            break
+        cuts.append(cut)
+        target = max(target + segment_chars, cut + len(start_tag))
+    return cuts
+
+
+def _parse_segment(
+    segment: str, lookahead: Optional[str], parser_options: Dict[str, Any]
+) -> _SegmentResult:
+    """Worker entry point for :func:`parse_parallel`.
+
+    Parses ``segment`` from a fresh state with placeholder ids ``"0"``,
+    ``"1"``, ... and returns ``(events, ids drawn, at_tool, nameless)``.
+    Without a lookahead this is the last segment and is flushed; otherwise
+    ``at_tool`` tells whether the lookahead start tag opened a top-level tool.
+    ``nameless`` is set if a tool block without a name was discarded. A
+    :class:`ToolParseError` is returned rather than raised, since it only
+    matters if every earlier cut holds.
+    """
+    counter = itertools.count()
+    parser = XMLParser(id_factory=lambda: str(next(counter)), **parser_options)
+    try:
+        if lookahead is None:
+            events = parser.parse(segment)
+            at_tool = True
+        else:
+            events = parser.parse_chunk(segment + lookahead)
+            at_tool = parser._at_tool_start()
+    except ToolParseError as error:
+        return [], 0, True, False, error
+    nameless = parser.tool_parser.nameless_blocks > 0
+    return [_encode(event) for event in events], next(counter), at_tool, nameless, None
+
+
+def _parse_batch(texts: Sequence[str], output: str, parser_options: Dict[str, Any]) -> list:
+    """Worker entry point: parse ``texts`` and encode the results compactly."""
+    results = []
+    for text in texts:
+        events = XMLParser(**parser_options).parse(text)
+        if output == "tool_uses":
+            results.append([(tool.name, tool.args, tool.offsets) for tool in _tool_uses(events)])
+        else:
+            results.append([_encode(event) for event in events])
+    return results
+
+
+def _tool_uses(events: List[ParserEvent]) -> List[ToolUse]:
+    return [event.tool for event in events if event.tool is not None]
+
+
+def _encode(event: ParserEvent) -> _EncodedEvent:
+    tool = event.tool
+    return (
+        str(event.type),
+        str(event.mode),
+        event.id,
+        event.content,
+        event.tag,
+        None if tool is None else (tool.name, tool.args, tool.offsets),
+        event.start,
+        event.end,
+    )
+
+
+def _decode(
+    encoded: _EncodedEvent, ids: Optional[List[str]] = None, base: int = 0
+) -> ParserEvent:
+    """Rebuild an event; with ``ids``, its id is an index into them.
+
+    ``base`` is added to every offset.
+    """
+    kind, mode, event_id, content, tag, tool, start, end = encoded
+    if tool is not None:
+        name, args, offsets = tool
+        if base:
+            offsets = {arg: (left + base, right + base) for arg, (left, right) in offsets.items()}
+        tool = ToolUse(name, args, offsets)
+    if base:
+        start = None if start is None else start + base
+        end = None if end is None else end + base
+    return ParserEvent(
+        type=_TYPES[kind],
+        mode=_MODES[mode],
+        id=event_id if ids is None else ids[int(event_id)],
+        tool=tool,
+        is_tool_call=tool is not None,
+        content=content,
+        tag=tag,
+        start=start,
+        end=end,
+    )
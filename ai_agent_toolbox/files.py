@@ -0,0 +1,63 @@
+"""Parse transcripts straight from files on disk."""
+
+from __future__ import annotations
+
+import mmap
+import os
+from typing import Any, Iterator, List, Union
+
+from ai_agent_toolbox.batch import OUTPUTS
+from ai_agent_toolbox.parser_event import EventType, ParserEvent
+from ai_agent_toolbox.tool_use import ToolUse
+from ai_agent_toolbox.xml_parser import XMLParser
+
+# Bytes handed to the parser at a time; bounds the decoded text held at once
+DEFAULT_WINDOW_BYTES = 1 << 20
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def iter_file_events(
+    path: PathLike, window_bytes: int = DEFAULT_WINDOW_BYTES, **parser_options: Any
+) -> Iterator[ParserEvent]:
+    """Yield the events of a UTF-8 file, parsed by a fresh :class:`XMLParser`.
+
+    The file is memory-mapped and fed to the parser ``window_bytes`` at a
+    time, so only one window is decoded at once whatever the file size. The
+    parser is flushed at the end of the file. ``parser_options`` are passed
+    to :class:`XMLParser`.
+    """
+    if window_bytes < 1:
+        raise ValueError("window_bytes must be at least 1")
+    parser = XMLParser(**parser_options)
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, size, window_bytes):
+                    yield from parser.parse_bytes_chunk(mapped[offset:offset + window_bytes])
+    yield from parser.flush()
+
+
+def parse_file(
+    path: PathLike,
+    output: str = "events",
+    window_bytes: int = DEFAULT_WINDOW_BYTES,
+    **parser_options: Any,
+) -> Union[List[ParserEvent], List[ToolUse]]:
+    """Parse a UTF-8 file, see :func:`iter_file_events`.
+
+    ``output="tool_uses"`` returns only the closed tool calls and skips
+    building text and block events, so memory is bounded by the tool calls
+    themselves.
+    """
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output {output!r}; expected one of {OUTPUTS}")
+    if output == "events":
+        return list(iter_file_events(path, window_bytes, **parser_options))
+    parser_options.setdefault("event_types", (EventType.TOOL.value,))
+    return [
+        event.tool
+        for event in iter_file_events(path, window_bytes, **parser_options)
+        if event.tool is not None
+    ]
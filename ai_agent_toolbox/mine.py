@@ -0,0 +1,282 @@
+"""Extract tool uses from JSONL conversation logs.
+
+Usage::
+
+    python -m ai_agent_toolbox.mine logs/*.jsonl --field response --tag tool -o tools.jsonl
+
+Each input line is a JSON object; the text at ``--field`` (a dotted path such
+as ``message.content`` or ``choices.0.text``) is parsed with
+:class:`~ai_agent_toolbox.XMLParser`, and every closed tool call is written as
+one JSON line::
+
+    {"source": "logs/a.jsonl", "line": 12, "name": "search",
+     "args": {"query": "..."}, "start": 40, "end": 118}
+
+``start``/``end`` are character offsets of the tool block within the field.
+Lines are parsed in worker processes, with a bounded number of batches in
+flight so memory stays flat however fast the input is read. Progress and
+throughput go to stderr.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ai_agent_toolbox._compat import DATACLASS_SLOTS
+from ai_agent_toolbox.tool_parser import ToolParseError
+from ai_agent_toolbox.xml_parser import XMLParser
+
+# (line number, raw line)
+_Line = Tuple[int, bytes]
+
+
+@dataclass(**DATACLASS_SLOTS)
+class BatchResult:
+    """Output of one batch of lines; records are already serialized."""
+
+    records: List[str] = dataclass_field(default_factory=list)
+    lines: int = 0
+    bytes: int = 0
+    tool_uses: int = 0
+    errors: int = 0
+
+
+def mine_lines(
+    source: str, lines: Sequence[_Line], field_path: Sequence[str], tag: str
+) -> BatchResult:
+    """Parse the text at ``field_path`` of each JSON line and serialize its tool uses.
+
+    Lines that are not JSON, lack a string at ``field_path``, or hold a tool
+    block the parser rejects (such as an empty ``<name>``) count as errors
+    and are skipped.
+    """
+    result = BatchResult()
+    for number, raw in lines:
+        result.lines += 1
+        result.bytes += len(raw)
+        try:
+            text = _lookup(json.loads(raw), field_path)
+        except (ValueError, KeyError, IndexError, TypeError):
+            result.errors += 1
+            continue
+        if not isinstance(text, str):
+            result.errors += 1
+            continue
+
+        try:
+            events = XMLParser(tag=tag, event_types=("tool",)).parse(text)
+        except ToolParseError:
+            result.errors += 1
+            continue
+        for event in events:
+            if event.tool is None:
+                continue
+            record = {
+                "source": source,
+                "line": number,
+                "name": event.tool.name,
+                "args": event.tool.args,
+                "start": event.start,
+                "end": event.end,
+            }
+            result.records.append(json.dumps(record, ensure_ascii=False))
+            result.tool_uses += 1
+    return result
+
+
+def _lookup(value: Any, path: Sequence[str]) -> Any:
+    for key in path:
+        value = value[int(key)] if isinstance(value, list) else value[key]
+    return value
+
+
+def _read_batches(paths: Sequence[str], batch_lines: int) -> Iterator[Tuple[str, List[_Line]]]:
+    for path in paths:
+        with _open_input(path) as file:
+            batch: List[_Line] = []
+            for number, raw in enumerate(file, 1):
+                if not raw.strip():
+                    continue
+                batch.append((number, raw))
+                if len(batch) >= batch_lines:
+                    yield path, batch
+                    batch = []
+            if batch:
+                yield path, batch
+
+
+def _open_input(path: str) -> IO[bytes]:
+    if path == "-":
+        return os.fdopen(os.dup(sys.stdin.fileno()), "rb")
+    return open(path, "rb")
+
+
+class _Progress:
+    """Throttled progress and throughput reporting."""
+
+    def __init__(self, stream: Optional[IO[str]], interval: float) -> None:
+        self.stream = stream
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.lines = 0
+        self.bytes = 0
+        self.tool_uses = 0
+        self.errors = 0
+
+    def add(self, result: BatchResult) -> None:
+        self.lines += result.lines
+        self.bytes += result.bytes
+        self.tool_uses += result.tool_uses
+        self.errors += result.errors
+        now = time.monotonic()
+        if self.stream is not None and now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(now, final=False)
+
+    def totals(self) -> Dict[str, float]:
+        return {
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "tool_uses": self.tool_uses,
+            "errors": self.errors,
+            "seconds": time.monotonic() - self.started,
+        }
+
+    def report(self, now: Optional[float] = None, final: bool = True) -> None:
+        if self.stream is None:
+            return
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        print(
+            f"{'done' if final else 'progress'}: {self.lines:,} lines, "
+            f"{self.tool_uses:,} tool uses, {self.errors:,} skipped, "
+            f"{self.bytes / 1e6 / elapsed:.1f} MB/s, {self.lines / elapsed:,.0f} lines/s "
+            f"({elapsed:.1f}s)",
+            file=self.stream,
+            flush=True,
+        )
+
+
+def mine(
+    paths: Sequence[str],
+    output: IO[str],
+    field: str,
+    tag: str = "tool",
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    batch_lines: int = 256,
+    max_pending: Optional[int] = None,
+    progress: Optional[IO[str]] = None,
+    progress_interval: float = 5.0,
+    executor: Optional[Executor] = None,
+) -> Dict[str, float]:
+    """Mine ``paths`` and write tool use records to ``output``.
+
+    Batches of ``batch_lines`` lines are parsed in ``workers`` processes (in
+    this process with one worker). At most ``max_pending`` batches (default:
+    four per worker) are in flight; reading waits for results beyond that.
+    With ``ordered=False`` results are written as soon as they complete.
+    Returns the final counters: lines, bytes, tool_uses, errors (skipped
+    lines) and seconds.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if max_pending is None:
+        max_pending = workers * 4
+    field_path = field.split(".")
+    counters = _Progress(progress, progress_interval)
+
+    def write(result: BatchResult) -> None:
+        for record in result.records:
+            output.write(record)
+            output.write("\n")
+        counters.add(result)
+
+    batches = _read_batches(paths, batch_lines)
+    if executor is None and workers == 1:
+        for source, lines in batches:
+            write(mine_lines(source, lines, field_path, tag))
+        counters.report()
+        return counters.totals()
+
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        if ordered:
+            pending: Deque[Future] = deque()
+            for source, lines in batches:
+                if len(pending) >= max_pending:
+                    write(pending.popleft().result())
+                pending.append(pool.submit(mine_lines, source, lines, field_path, tag))
+            while pending:
+                write(pending.popleft().result())
+        else:
+            in_flight: Set[Future] = set()
+            for source, lines in batches:
+                if len(in_flight) >= max_pending:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(future.result())
+                in_flight.add(pool.submit(mine_lines, source, lines, field_path, tag))
+            for future in in_flight:
+                write(future.result())
+    finally:
+        if executor is None:
+            pool.shutdown()
+    counters.report()
+    return counters.totals()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m ai_agent_toolbox.mine",
+        description="Extract tool uses from JSONL conversation logs.",
+    )
+    parser.add_argument("inputs", nargs="+", help="JSONL files, or - for stdin")
+    parser.add_argument("--field", required=True, help="dotted path to the text, e.g. message.content")
+    parser.add_argument("--tag", default="tool", help="tool tag (default: tool)")
+    parser.add_argument("-o", "--output", default="-", help="output JSONL file (default: stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--unordered", action="store_true", help="write results as they complete")
+    parser.add_argument("--batch-lines", type=int, default=256, help="lines per worker task (default: 256)")
+    parser.add_argument("--max-pending", type=int, default=None, help="batches in flight (default: 4 per worker)")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        mine(
+            args.inputs,
+            output,
+            field=args.field,
+            tag=args.tag,
+            workers=args.workers,
+            ordered=not args.unordered,
+            batch_lines=args.batch_lines,
+            max_pending=args.max_pending,
+            progress=None if args.quiet else sys.stderr,
+            progress_interval=args.progress_interval,
+        )
+    except BrokenPipeError:
+        # Output closed early, e.g. piped into head; stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,28 @@
 from __future__ import annotations
 
-from typing import List
+import codecs
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Union
 
 from ai_agent_toolbox.parser_event import ParserEvent
 
+BytesLike = Union[bytes, bytearray, memoryview]
+Chunk = Union[str, BytesLike]
+
+
+def _last_char_start(data: Union[bytes, bytearray]) -> int:
+    """Return the index where the last UTF-8 character of ``data`` starts."""
+    index = len(data) - 1
+    stop = max(index - 3, 0)
+    # Skip back over continuation bytes (0b10xxxxxx)
+    while index > stop and 0x80 <= data[index] < 0xC0:
+        index -= 1
+    return index
+
 
 class Parser:
+    # Incremental UTF-8 decoder for parse_bytes_chunk, created on first use
+    _decoder: Optional[codecs.IncrementalDecoder] = None
+
     def parse(self, text: str) -> List[ParserEvent]:
         return self.parse_chunk(text) + self.flush()
 
@@ -14,3 +31,110 @@ class Parser:
 
     def flush(self) -> List[ParserEvent]:
         raise NotImplementedError
+
+    def parse_stream(self, chunks: Iterable[Chunk]) -> Iterator[ParserEvent]:
+        """Yield events for each chunk of ``chunks``, then those of ``flush()``.
+
+        Chunks may be ``str`` or UTF-8 bytes. Closing the generator early
+        skips the flush and leaves the parser mid-stream.
+        """
+        for chunk in chunks:
+            yield from self._parse_any_chunk(chunk)
+        yield from self.flush()
+
+    async def aparse(self, chunks: AsyncIterable[Chunk]) -> AsyncIterator[ParserEvent]:
+        """Async version of :meth:`parse_stream`.
+
+        Events parsed from one chunk are handed over without awaiting in
+        between, so the loop is only entered while waiting for ``chunks``.
+        """
+        batches = self.aparse_batches(chunks)
+        try:
+            async for events in batches:
+                for event in events:
+                    yield event
+        finally:
+            await batches.aclose()
+
+    async def aparse_batches(
+        self, chunks: AsyncIterable[Chunk]
+    ) -> AsyncIterator[List[ParserEvent]]:
+        """Like :meth:`aparse`, but yield the events of each chunk as one list.
+
+        Empty lists are skipped. A chunk that produces many events costs one
+        step of the consumer's ``async for`` instead of one per event.
+
+        If the consumer stops early or is cancelled, ``chunks`` is closed (when
+        it has ``aclose``) and no flush happens.
+        """
+        iterator = chunks.__aiter__()
+        exhausted = False
+        try:
+            while True:
+                try:
+                    chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                events = self._parse_any_chunk(chunk)
+                if events:
+                    yield events
+            events = self.flush()
+            if events:
+                yield events
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if not exhausted and aclose is not None:
+                await aclose()
+
+    def _parse_any_chunk(self, chunk: Chunk) -> List[ParserEvent]:
+        if isinstance(chunk, str):
+            return self.parse_chunk(chunk)
+        return self.parse_bytes_chunk(chunk)
+
+    def parse_bytes_chunk(self, chunk: BytesLike, errors: str = "strict") -> List[ParserEvent]:
+        """Process a chunk of UTF-8 encoded bytes.
+
+        Multibyte characters split across chunks are held back until their
+        remaining bytes arrive. ``errors`` is the codec error handler used for
+        invalid input. ``flush()`` raises (or substitutes, per ``errors``) for
+        a character still incomplete at the end of the stream.
+        """
+        decoder = self._decoder
+        if decoder is None:
+            decoder = self._decoder = codecs.getincrementaldecoder("utf-8")(errors)
+        decoder.errors = errors
+
+        if not isinstance(chunk, memoryview) and not decoder.getstate()[0]:
+            # On a character boundary; leading bytes nobody will see are
+            # dropped without decoding them
+            skip = self._skippable_bytes(chunk)
+            if skip and skip == len(chunk):
+                # Keep the last character, which may be incomplete
+                skip = _last_char_start(chunk)
+            if skip:
+                self._bytes_skipped(chunk, skip)
+                chunk = memoryview(chunk)[skip:]
+        return self.parse_chunk(decoder.decode(chunk))
+
+    def _skippable_bytes(self, chunk: Union[bytes, bytearray]) -> int:
+        """Return how many leading bytes of ``chunk`` can be discarded unseen.
+
+        Called only on a character boundary. Subclasses override this when
+        part of the input can never produce events; skipped bytes are not
+        validated.
+        """
+        return 0
+
+    def _bytes_skipped(self, chunk: Union[bytes, bytearray], count: int) -> None:
+        """Called after the first ``count`` bytes of ``chunk`` were skipped."""
+
+    def _finish_bytes(self) -> str:
+        """Return text still pending in the bytes decoder and reset it."""
+        decoder = self._decoder
+        if decoder is None:
+            return ""
+        try:
+            return decoder.decode(b"", final=True)
+        finally:
+            decoder.reset()
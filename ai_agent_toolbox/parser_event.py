@@ -1,14 +1,44 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import Enum
 from typing import Optional
 
+from ._compat import DATACLASS_SLOTS
 from .tool_use import ToolUse
 
-@dataclass
+
+class _StrConstant(str, Enum):
+    """Enum member that compares, hashes, prints and formats as its value."""
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __format__(self, format_spec: str) -> str:
+        return self.value.__format__(format_spec)
+
+
+class EventType(_StrConstant):
+    """Values of :attr:`ParserEvent.type`."""
+
+    TEXT = "text"
+    TOOL = "tool"
+    BLOCK = "block"
+
+
+class EventMode(_StrConstant):
+    """Values of :attr:`ParserEvent.mode`."""
+
+    CREATE = "create"
+    APPEND = "append"
+    CLOSE = "close"
+
+
+@dataclass(**DATACLASS_SLOTS)
 class ParserEvent:
-    # 'type' will be either "text" or "tool"
+    # 'type' will be "text", "tool", or "block" (a tagged text block).
+    # Parsers emit EventType members, which compare equal to those strings.
     type: str
 
-    # 'mode' is "create", "append", or "close"
+    # 'mode' is "create", "append", or "close" (EventMode members)
     mode: str
 
     # Unique ID for the text or tool being tracked
@@ -22,3 +52,13 @@ class ParserEvent:
 
     # Free-form content (e.g. a snippet of text or partial argument text)
     content: Optional[str] = None
+
+    # For "block" events, the tag the block was opened with (e.g. "think")
+    tag: Optional[str] = None
+
+    # Character offsets in the parsed stream: for "append", of content; for
+    # "create", where the text, block or tool starts (end stays None); for
+    # "close", of the whole text, block or tool including its tags. Not
+    # compared by ==.
+    start: Optional[int] = field(default=None, compare=False)
+    end: Optional[int] = field(default=None, compare=False)
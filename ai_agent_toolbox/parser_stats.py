@@ -0,0 +1,61 @@
+"""Counters describing what a parser has processed."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from ._compat import DATACLASS_SLOTS
+from .parser_event import EventMode, EventType, ParserEvent
+
+# "type.mode" key of each event kind, e.g. "tool.close"
+_EVENT_KEYS: Dict[Tuple[str, str], str] = {
+    (kind, mode): f"{kind.value}.{mode.value}" for kind in EventType for mode in EventMode
+}
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ParserStats:
+    """Counters updated by a parser created with ``stats=``.
+
+    One instance may be shared by many parsers to aggregate them; high-water
+    marks are then the maximum over all of them. Counters are updated once per
+    ``parse_chunk``/``flush`` call and once per tool block, so keeping them
+    costs nothing per character. :meth:`as_dict` gives a plain ``dict`` for
+    metrics exporters.
+    """
+
+    # parse_chunk calls, including those made by parse_bytes_chunk
+    chunks: int = 0
+    # Characters consumed, including those parse_bytes_chunk skipped unseen
+    chars: int = 0
+    # Events returned, keyed "type.mode", e.g. "tool.close"
+    events: Dict[str, int] = field(default_factory=dict)
+    # Tool blocks closed, and tool blocks discarded for having no <name>
+    tool_blocks: int = 0
+    nameless_blocks: int = 0
+    # Most characters held between calls in XMLParser.outside_buffer and in
+    # the tool parser (its buffer plus input held while awaiting a token)
+    outside_buffer_high: int = 0
+    tool_buffer_high: int = 0
+    # Wall time spent in parse_chunk and flush
+    parse_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as a new plain ``dict``."""
+        return {
+            "chunks": self.chunks,
+            "chars": self.chars,
+            "events": dict(self.events),
+            "tool_blocks": self.tool_blocks,
+            "nameless_blocks": self.nameless_blocks,
+            "outside_buffer_high": self.outside_buffer_high,
+            "tool_buffer_high": self.tool_buffer_high,
+            "parse_seconds": self.parse_seconds,
+        }
+
+    def _add_events(self, events: List[ParserEvent]) -> None:
+        counts = self.events
+        for event in events:
+            key = _EVENT_KEYS[event.type, event.mode]
+            counts[key] = counts.get(key, 0) + 1
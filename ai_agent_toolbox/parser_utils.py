@@ -2,19 +2,69 @@
 
 from __future__ import annotations
 
+import time
 import uuid
-from typing import Callable, List, Optional
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from collections.abc import MutableSequence
 
-from ai_agent_toolbox.parser_event import ParserEvent
+from ai_agent_toolbox.parser_event import EventMode, EventType, ParserEvent
 
+IdFactory = Callable[[], str]
 
-def emit_text_block_events(text_buffer: MutableSequence[str]) -> List[ParserEvent]:
+# Bound once: an enum member lookup costs as much as building the event
+_APPEND = EventMode.APPEND
+
+
+def uuid4_id() -> str:
+    """Return a random UUID4 string, unique across streams and processes."""
+
+    return str(uuid.uuid4())
+
+
+class CounterIdFactory:
+    """Id factory yielding ``"<prefix>-1"``, ``"<prefix>-2"``, ...
+
+    The prefix and next number are plain attributes, so the position can be
+    saved and restored with the rest of a parser's state.
+    """
+
+    __slots__ = ("prefix", "next_id")
+
+    def __init__(self, prefix: str, next_id: int = 1) -> None:
+        self.prefix = prefix
+        self.next_id = next_id
+
+    def __call__(self) -> str:
+        number = self.next_id
+        self.next_id = number + 1
+        return f"{self.prefix}-{number}"
+
+
+def counter_id_factory(prefix: Optional[str] = None) -> IdFactory:
+    """Return a cheap id factory yielding ``"<prefix>-1"``, ``"<prefix>-2"``, ...
+
+    Ids only need to correlate events within one stream, so a counter avoids
+    an ``os.urandom`` call and UUID formatting per block. The default prefix is
+    random (one UUID per factory), so ids from different parsers are unlikely
+    to collide.
+    """
+
+    if prefix is None:
+        prefix = uuid.uuid4().hex[:12]
+    return CounterIdFactory(prefix)
+
+
+def emit_text_block_events(
+    text_buffer: MutableSequence[str], id_factory: IdFactory = uuid4_id
+) -> List[ParserEvent]:
     """Convert buffered text into create/append/close events.
 
     Args:
         text_buffer: A mutable sequence accumulating pieces of text that should
             be emitted together as a single text block.
+        id_factory: Callable returning the id for the block.
 
     Returns:
         A list of ``ParserEvent`` objects representing the standard
@@ -38,17 +88,17 @@ def emit_text_block_events(text_buffer: MutableSequence[str]) -> List[ParserEven
     if not text:
         return []
 
-    text_id = str(uuid.uuid4())
+    text_id = id_factory()
     return [
-        ParserEvent(type="text", mode="create", id=text_id, is_tool_call=False),
+        ParserEvent(type=EventType.TEXT, mode=EventMode.CREATE, id=text_id, is_tool_call=False),
         ParserEvent(
-            type="text",
-            mode="append",
+            type=EventType.TEXT,
+            mode=EventMode.APPEND,
             id=text_id,
             content=text,
             is_tool_call=False,
         ),
-        ParserEvent(type="text", mode="close", id=text_id, is_tool_call=False),
+        ParserEvent(type=EventType.TEXT, mode=EventMode.CLOSE, id=text_id, is_tool_call=False),
     ]
 
 
@@ -59,9 +109,18 @@ class TextEventStream:
     events interleaved with other parser events. It tracks the current text
     block identifier, lazily opens a block on demand, and ensures the expected
     ``create``/``append``/``close`` sequence is emitted.
+
+    A stream created with ``enabled=False`` still tracks whether a block is
+    open but never builds or emits events, nor draws ids.
     """
 
-    def __init__(self, emit_event: Callable[[ParserEvent], None]):
+    def __init__(
+        self,
+        emit_event: Callable[[ParserEvent], None],
+        event_type: str = EventType.TEXT,
+        id_factory: IdFactory = uuid4_id,
+        enabled: bool = True,
+    ):
         """Create a :class:`TextEventStream`.
 
         Args:
@@ -69,10 +128,29 @@ class TextEventStream:
                 The callable is invoked every time the helper needs to emit an
                 event, allowing the owning parser to control how events are
                 collected.
+            event_type: The ``type`` given to emitted events, e.g. ``EventType.BLOCK``
+                for tagged text blocks.
+            id_factory: Callable returning the id for each new block.
+            enabled: Whether events are emitted at all. Callers may check
+                :attr:`enabled` to skip preparing text that would be dropped.
         """
 
+        self.enabled = enabled
         self._emit_event = emit_event
+        self._event_type = event_type
+        self._id_factory = id_factory
         self._current_text_id: Optional[str] = None
+        self._current_tag: Optional[str] = None
+        self._is_open = False
+        # Stream offsets where the open block starts and its text so far ends
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether a block is currently open."""
+
+        return self._is_open
 
     @property
     def current_text_id(self) -> Optional[str]:
@@ -80,44 +158,399 @@ class TextEventStream:
 
         return self._current_text_id
 
-    def stream(self, text: str) -> None:
-        """Append text to the active text block, creating one if needed."""
+    @property
+    def current_tag(self) -> Optional[str]:
+        """Return the tag the currently open block was opened with, if any."""
+
+        return self._current_tag
+
+    def get_state(self) -> Optional[List[Any]]:
+        """Return ``[id, tag, start, end]`` of the open block, or None; see :meth:`set_state`."""
+
+        if not self._is_open:
+            return None
+        return [self._current_text_id, self._current_tag, self._start, self._end]
+
+    def set_state(self, state: Optional[List[Any]]) -> None:
+        """Reopen the block described by :meth:`get_state`, without emitting."""
+
+        self._is_open = state is not None
+        if state is None:
+            state = [None, None, None, None]
+        self._current_text_id, self._current_tag, self._start, self._end = state
 
-        if not text:
+    def stream(self, text: str, start: Optional[int] = None) -> None:
+        """Append text to the active text block, creating one if needed.
+
+        ``start`` is the stream offset of ``text``, if known.
+        """
+
+        if not text or not self.enabled:
             return
-        self.open()
+        if not self._is_open:
+            self.open(start=start)
+        end = None if start is None else start + len(text)
+        self._end = end
+        # Positional, in field order (type, mode, id, tool, is_tool_call,
+        # content, tag, start, end): keywords cost twice as much per event
         self._emit_event(
             ParserEvent(
-                type="text",
-                mode="append",
-                id=self._current_text_id,
-                is_tool_call=False,
-                content=text,
+                self._event_type, _APPEND, self._current_text_id, None, False,
+                text, self._current_tag, start, end,
             )
         )
 
-    def open(self) -> None:
-        """Emit a ``create`` event if no text block is currently open."""
+    def open(self, tag: Optional[str] = None, start: Optional[int] = None) -> None:
+        """Emit a ``create`` event if no text block is currently open.
 
-        if self._current_text_id is not None:
+        ``start`` is the stream offset where the block begins, if known.
+        """
+
+        if self._is_open:
+            return
+        self._is_open = True
+        self._current_tag = tag
+        if not self.enabled:
             return
-        text_id = str(uuid.uuid4())
+        self._start = self._end = start
+        text_id = self._id_factory()
         self._current_text_id = text_id
         self._emit_event(
-            ParserEvent(type="text", mode="create", id=text_id, is_tool_call=False)
+            ParserEvent(
+                type=self._event_type,
+                mode=EventMode.CREATE,
+                id=text_id,
+                is_tool_call=False,
+                tag=tag,
+                start=start,
+            )
         )
 
-    def close(self) -> None:
-        """Emit a ``close`` event for the active text block, if present."""
+    def close(self, end: Optional[int] = None) -> None:
+        """Emit a ``close`` event for the active text block, if present.
 
-        if self._current_text_id is None:
+        ``end`` is the stream offset where the block ends, e.g. after its close
+        tag; by default, the end of the text streamed into it.
+        """
+
+        if not self._is_open:
             return
-        self._emit_event(
-            ParserEvent(
-                type="text",
-                mode="close",
-                id=self._current_text_id,
-                is_tool_call=False,
+        if self.enabled:
+            self._emit_event(
+                ParserEvent(
+                    type=self._event_type,
+                    mode=EventMode.CLOSE,
+                    id=self._current_text_id,
+                    is_tool_call=False,
+                    tag=self._current_tag,
+                    start=self._start,
+                    end=self._end if end is None else end,
+                )
             )
-        )
+        self._is_open = False
         self._current_text_id = None
+        self._current_tag = None
+        self._start = self._end = None
+
+
+class EventCoalescer:
+    """Merges adjacent ``append`` events for the same id.
+
+    Each batch of events passed to :meth:`coalesce` comes back with runs of
+    appends for one id joined into a single event; every other event keeps its
+    position. Optionally, a merged append is held back across batches until it
+    reaches ``min_chars`` characters or has waited ``max_delay`` seconds. Any
+    other event releases the held append first, so ``create``/``close`` events
+    are never delayed and ordering is unchanged. A merged append keeps the
+    ``start`` of its first part and the ``end`` of its last.
+    """
+
+    def __init__(
+        self,
+        min_chars: int = 0,
+        max_delay: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create an :class:`EventCoalescer`.
+
+        Args:
+            min_chars: Hold a merged append until it has this many characters.
+            max_delay: Hold a merged append for at most this many seconds. The
+                delay is checked whenever a new batch arrives.
+            clock: Monotonic time source, in seconds.
+        """
+
+        self._min_chars = min_chars
+        self._max_delay = max_delay
+        self._holds = min_chars > 0 or max_delay is not None
+        self._clock = clock
+        self._pending: Optional[ParserEvent] = None
+        self._pending_parts: List[str] = []
+        self._pending_size = 0
+        self._pending_end: Optional[int] = None
+        self._pending_since = 0.0
+
+    def coalesce(self, events: List[ParserEvent], final: bool = False) -> List[ParserEvent]:
+        """Return ``events`` with adjacent appends merged.
+
+        Args:
+            events: Events in emission order.
+            final: Release any held append, e.g. when the parser is flushed.
+        """
+
+        out: List[ParserEvent] = []
+        for event in events:
+            pending = self._pending
+            if event.mode != EventMode.APPEND:
+                if pending is not None:
+                    self._release(out)
+                out.append(event)
+            elif pending is not None and pending.id == event.id and pending.type == event.type:
+                self._pending_parts.append(event.content)
+                self._pending_size += len(event.content)
+                self._pending_end = event.end
+            else:
+                if pending is not None:
+                    self._release(out)
+                self._pending = event
+                self._pending_parts = [event.content]
+                self._pending_size = len(event.content)
+                self._pending_end = event.end
+                if self._max_delay is not None:
+                    self._pending_since = self._clock()
+
+        if self._pending is not None and (final or self._ready()):
+            self._release(out)
+        return out
+
+    def get_state(self) -> Optional[Dict[str, Any]]:
+        """Return the held append as plain data, or None if nothing is held."""
+
+        pending = self._pending
+        if pending is None:
+            return None
+        return {
+            "type": str(pending.type),
+            "id": pending.id,
+            "tag": pending.tag,
+            "content": "".join(self._pending_parts),
+            "start": pending.start,
+            "end": self._pending_end,
+            # Clocks differ between processes, so keep the age instead
+            "age": self._clock() - self._pending_since,
+        }
+
+    def set_state(self, state: Optional[Dict[str, Any]]) -> None:
+        """Hold the append described by :meth:`get_state` again."""
+
+        if state is None:
+            self._pending = None
+            self._pending_parts = []
+            self._pending_size = 0
+            return
+        self._pending = ParserEvent(
+            type=EventType(state["type"]),
+            mode=EventMode.APPEND,
+            id=state["id"],
+            is_tool_call=False,
+            content=state["content"],
+            tag=state["tag"],
+            start=state["start"],
+            end=state["end"],
+        )
+        self._pending_end = state["end"]
+        self._pending_parts = [state["content"]]
+        self._pending_size = len(state["content"])
+        self._pending_since = self._clock() - state["age"]
+
+    def _ready(self) -> bool:
+        if not self._holds:
+            return True
+        if self._min_chars and self._pending_size >= self._min_chars:
+            return True
+        return (
+            self._max_delay is not None
+            and self._clock() - self._pending_since >= self._max_delay
+        )
+
+    def _release(self, out: List[ParserEvent]) -> None:
+        pending = self._pending
+        if len(self._pending_parts) > 1:
+            pending = ParserEvent(
+                type=pending.type,
+                mode=EventMode.APPEND,
+                id=pending.id,
+                is_tool_call=False,
+                content="".join(self._pending_parts),
+                tag=pending.tag,
+                start=pending.start,
+                end=self._pending_end,
+            )
+        out.append(pending)
+        self._pending = None
+        self._pending_parts = []
+        self._pending_size = 0
+
+
+class TagMatcher:
+    """Incremental matcher for a fixed set of tags (Aho-Corasick automaton).
+
+    States are trie nodes. A partial match is identified by its state and the
+    text it stands for is the precomputed ``texts[state]``, so a match in
+    progress can be carried across chunks without keeping or rebuilding the
+    buffered text. With a single pattern this is the classic KMP matcher. Use
+    :func:`tag_matcher` to obtain a shared instance per tag set.
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        if not patterns or not all(patterns):
+            raise ValueError("TagMatcher patterns must be non-empty strings")
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(patterns))
+        self.max_length = max(len(pattern) for pattern in self.patterns)
+
+        goto: List[Dict[str, int]] = [{}]
+        texts: List[str] = [""]
+        matches: List[Optional[str]] = [None]
+        for pattern in self.patterns:
+            state = 0
+            for size, char in enumerate(pattern, 1):
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(texts)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    texts.append(pattern[:size])
+                    matches.append(None)
+                state = nxt
+            matches[state] = pattern
+
+        # Failure links in breadth-first order; a node also reports the
+        # longest pattern ending at one of its suffixes.
+        failure = [0] * len(texts)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                fallback = failure[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = failure[fallback]
+                target = goto[fallback].get(char, 0)
+                failure[nxt] = target if target != nxt else 0
+                if matches[nxt] is None:
+                    matches[nxt] = matches[failure[nxt]]
+
+        self._goto: Tuple[Dict[str, int], ...] = tuple(goto)
+        self._failure: Tuple[int, ...] = tuple(failure)
+        self._matches: Tuple[Optional[str], ...] = tuple(matches)
+        # texts[state] is the buffered text a partial match stands for
+        self.texts: Tuple[str, ...] = tuple(texts)
+        self._states: Dict[str, int] = {text: state for state, text in enumerate(texts)}
+        self._first_chars = "".join(dict.fromkeys(pattern[0] for pattern in self.patterns))
+
+    def state_of(self, text: str) -> int:
+        """Return the state whose buffered text is ``text``."""
+
+        return self._states[text]
+
+    def match(self, state: int) -> Optional[str]:
+        """Return the pattern completed on entering ``state``, if any."""
+
+        return self._matches[state]
+
+    def step(self, state: int, char: str) -> int:
+        """Advance the automaton from ``state`` by one character."""
+
+        goto = self._goto
+        while True:
+            nxt = goto[state].get(char)
+            if nxt is not None:
+                return nxt
+            if not state:
+                return 0
+            state = self._failure[state]
+
+    def find(self, text: str, start: int, hits: Dict[str, int]) -> Tuple[int, str]:
+        """Return ``(index, pattern)`` of the leftmost pattern in ``text[start:]``.
+
+        ``hits`` caches the next occurrence of each pattern for one ``text``,
+        so repeated calls with increasing ``start`` do not rescan. Returns
+        ``(-1, "")`` if no pattern occurs.
+        """
+
+        best = -1
+        best_pattern = ""
+        for pattern in self.patterns:
+            index = hits.get(pattern, -2)
+            if index == -2 or -1 < index < start:
+                index = text.find(pattern, start)
+                hits[pattern] = index
+            if index != -1 and (best == -1 or index < best):
+                best = index
+                best_pattern = pattern
+        return best, best_pattern
+
+    def resume(self, state: int, text: str, start: int) -> Tuple[int, int]:
+        """Continue a partial match carried over from earlier input.
+
+        Characters of ``text`` from ``start`` are consumed only while the
+        candidate match still begins inside the carried-over text.
+
+        Returns:
+            ``(state, index)`` where ``index`` is the position in ``text`` just
+            past the characters consumed. If ``match(state)`` is set a pattern
+            was completed; otherwise the candidate now starts at
+            ``index - len(texts[state])``.
+        """
+
+        texts = self.texts
+        matches = self._matches
+        index = start
+        end = len(text)
+        while index < end and len(texts[state]) > index - start:
+            state = self.step(state, text[index])
+            index += 1
+            if matches[state] is not None:
+                break
+        return state, index
+
+    def suffix_state(self, text: str, start: int = 0) -> int:
+        """Return the state for the longest suffix of ``text[start:]`` that is
+        a proper prefix of a pattern.
+
+        Assumes no pattern occurs in ``text[start:]``.
+        """
+
+        end = len(text)
+        lookbehind = max(start, end - self.max_length + 1)
+        if len(self._first_chars) == 1:
+            # Usual case: every tag starts with "<"
+            index = text.find(self._first_chars, lookbehind)
+        else:
+            index = min(
+                (found for found in (text.find(char, lookbehind) for char in self._first_chars) if found != -1),
+                default=-1,
+            )
+        if index == -1:
+            return 0
+        state = 0
+        while index < end:
+            state = self.step(state, text[index])
+            index += 1
+        return state
+
+
+# Matchers kept for reuse; bounded, as tag sets come from callers
+TAG_MATCHER_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=TAG_MATCHER_CACHE_SIZE)
+def tag_matcher(*patterns: str) -> TagMatcher:
+    """Return a shared :class:`TagMatcher` for ``patterns``.
+
+    The most recently used ``TAG_MATCHER_CACHE_SIZE`` matchers are kept, so
+    parsers for the same tags share one while many distinct tag sets do not
+    accumulate.
+    """
+
+    return TagMatcher(patterns)
@@ -0,0 +1,101 @@
+"""Tool argument values kept in temporary files instead of memory."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import weakref
+from typing import IO, Any, Iterator, Optional
+
+# Characters per chunk for SpilledArg.iter_chunks
+_READ_CHARS = 1 << 16
+
+
+def _discard(file: IO[str], path: str) -> None:
+    file.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SpilledArg:
+    """A tool argument value stored in a temporary UTF-8 file.
+
+    :class:`~ai_agent_toolbox.XMLParser` produces these in ``ToolUse.args``
+    for arguments longer than its ``spill_threshold``. The text is read from
+    disk only when asked for: stream it with :meth:`open` or
+    :meth:`iter_chunks`, hand :attr:`path` to another program, or call
+    :meth:`read` (or ``str()``) for the whole value. ``len()`` is the length
+    in characters, and a ``SpilledArg`` compares equal to the ``str`` it holds.
+
+    The file is only kept open while the value is being written; once the
+    tool closes, each read opens it anew. The file is deleted when the object
+    is garbage collected, or earlier with :meth:`discard`. Pickling (e.g. to another process) produces a plain
+    ``str``.
+    """
+
+    __slots__ = ("path", "_file", "_length", "_finalizer", "__weakref__")
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        fd, self.path = tempfile.mkstemp(prefix="arg-", suffix=".txt", dir=directory)
+        # newline="" keeps the text byte-for-byte, "\r\n" included
+        self._file: Optional[IO[str]] = os.fdopen(fd, "w", encoding="utf-8", newline="")
+        self._length = 0
+        self._finalizer = weakref.finalize(self, _discard, self._file, self.path)
+
+    def _write(self, text: str) -> None:
+        self._file.write(text)
+        self._length += len(text)
+
+    def _finish(self) -> None:
+        """Close the writer, releasing its descriptor; called when the tool closes."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def open(self) -> IO[str]:
+        """Return a new text file object reading the value from the start."""
+        if self._file is not None:
+            # Still being written, e.g. read for a snapshot of an open tool
+            self._file.flush()
+        return open(self.path, encoding="utf-8", newline="")
+
+    def iter_chunks(self, size: int = _READ_CHARS) -> Iterator[str]:
+        """Yield the value in pieces of at most ``size`` characters."""
+        with self.open() as file:
+            while True:
+                chunk = file.read(size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def read(self) -> str:
+        """Return the whole value as a ``str``."""
+        with self.open() as file:
+            return file.read()
+
+    def discard(self) -> None:
+        """Delete the file now; the value cannot be read afterwards."""
+        self._finalizer()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self.read()
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SpilledArg):
+            return other is self or (len(other) == self._length and other.read() == self.read())
+        if isinstance(other, str):
+            return len(other) == self._length and other == self.read()
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduce__(self) -> Any:
+        return (str, (self.read(),))
+
+    def __repr__(self) -> str:
+        return f"SpilledArg(path={self.path!r}, length={self._length})"
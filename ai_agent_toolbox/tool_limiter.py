@@ -0,0 +1,219 @@
+"""Concurrency and rate limits on the calls of one tool."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ._compat import DATACLASS_SLOTS
+
+
+@dataclass(**DATACLASS_SLOTS)
+class ToolLimitStats:
+    """Counters of a tool registered with ``max_concurrency`` or ``rate``.
+
+    Read them with :meth:`Toolbox.limit_stats`; they are live, not copies.
+    :meth:`as_dict` gives a plain ``dict`` for metrics exporters.
+    """
+
+    # Calls waiting for a concurrency slot or a rate token (queue depth)
+    queued: int = 0
+    # Calls admitted and not yet finished
+    running: int = 0
+    # Calls admitted in total
+    calls: int = 0
+    # Seconds admitted calls spent waiting, in total and at most
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as a new plain ``dict``."""
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "calls": self.calls,
+            "wait_seconds": self.wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+
+class _Waiter:
+    """A caller queued for a concurrency slot, woken from any thread."""
+
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake: Callable[[], Any]) -> None:
+        self.wake = wake
+        # Set under the limiter's lock once the caller holds a slot
+        self.granted = False
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ToolLimiter:
+    """Admits calls of one tool under a concurrency limit and a rate limit.
+
+    At most ``max_concurrency`` calls run at once, and calls start at most
+    ``rate`` per second on average, from a token bucket holding ``burst``
+    tokens (default: one second's worth). The limits are shared by every
+    caller, whatever its thread or event loop: :meth:`acquire` blocks its
+    thread, and :meth:`acquire_async` waits without blocking its loop.
+    Waiting callers get slots in arrival order.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+    ) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst is not None and (rate is None or burst < 1):
+            raise ValueError("burst needs a rate and must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst or (max(1, int(rate)) if rate else 0)
+        self.stats = ToolLimitStats()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        # Guards the slots, the waiters, the bucket and the stats
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: Deque[_Waiter] = deque()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Block until a call may start; call :meth:`release` when it ends.
+
+        Returns False, holding nothing, if it could not start by
+        ``deadline`` (a :func:`time.monotonic` time).
+        """
+        started = time.monotonic()
+        event = threading.Event()
+        waiter = self._enter(event.set)
+        admitted = False
+        try:
+            if not waiter.granted:
+                event.wait(None if deadline is None else deadline - started)
+                if not waiter.granted:
+                    return False
+            if self.rate is not None:
+                delay = self._reserve(deadline)
+                if delay is None:
+                    return False
+                if delay > 0:
+                    time.sleep(delay)
+            admitted = True
+        finally:
+            self._leave(waiter, started, admitted)
+        return True
+
+    async def acquire_async(self, deadline: Optional[float] = None) -> bool:
+        """Async version of :meth:`acquire`, waiting on the running loop."""
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = self._enter(partial(loop.call_soon_threadsafe, _resolve, future))
+        admitted = False
+        try:
+            if not waiter.granted:
+                timeout = None if deadline is None else deadline - started
+                try:
+                    await asyncio.wait_for(future, timeout)
+                except asyncio.TimeoutError:
+                    pass
+                if not waiter.granted:
+                    return False
+            if self.rate is not None:
+                delay = self._reserve(deadline)
+                if delay is None:
+                    return False
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            admitted = True
+        finally:
+            self._leave(waiter, started, admitted)
+        return True
+
+    def release(self) -> None:
+        """End a call admitted by :meth:`acquire` or :meth:`acquire_async`."""
+        with self._lock:
+            self.stats.running -= 1
+            self._release_slot()
+
+    def _enter(self, wake: Callable[[], Any]) -> _Waiter:
+        """Queue a caller, granting it a free slot at once if there is one."""
+        waiter = _Waiter(wake)
+        with self._lock:
+            self.stats.queued += 1
+            if self.max_concurrency is None:
+                waiter.granted = True
+            elif self._active < self.max_concurrency:
+                self._active += 1
+                waiter.granted = True
+            else:
+                self._waiters.append(waiter)
+        return waiter
+
+    def _leave(self, waiter: _Waiter, started: float, admitted: bool) -> None:
+        """Record an admitted call, or give up the place of one that was not.
+
+        A waiter may be granted a slot just as it stops waiting, so the slot
+        is passed on here rather than by the caller.
+        """
+        waited = time.monotonic() - started
+        with self._lock:
+            stats = self.stats
+            stats.queued -= 1
+            if admitted:
+                stats.running += 1
+                stats.calls += 1
+                stats.wait_seconds += waited
+                if waited > stats.max_wait_seconds:
+                    stats.max_wait_seconds = waited
+            elif waiter.granted:
+                self._release_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release_slot(self) -> None:
+        """Hand a slot to the longest waiter, or free it; holds the lock."""
+        if self.max_concurrency is None:
+            return
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            try:
+                waiter.wake()
+                return
+            except RuntimeError:
+                # Its event loop is closed, so nobody is waiting any more
+                waiter.granted = False
+        self._active -= 1
+
+    def _reserve(self, deadline: Optional[float]) -> Optional[float]:
+        """Take a token, returning the seconds until it is available.
+
+        Tokens may go negative, so each waiter reserves the next free one and
+        waiters start in arrival order. Returns None, taking nothing, if the
+        token would only be available after ``deadline``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            delay = max(0.0, (1 - self._tokens) / self.rate)
+            if deadline is not None and now + delay > deadline:
+                return None
+            self._tokens -= 1
+            return delay
@@ -1,16 +1,45 @@
 from __future__ import annotations
 
-import uuid
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-from ai_agent_toolbox.parser_event import ParserEvent
+from ai_agent_toolbox.arg_span import ArgSpan
+from ai_agent_toolbox.parser_event import EventMode, EventType, ParserEvent
+from ai_agent_toolbox.parser_stats import ParserStats
 from ai_agent_toolbox.tool_use import ToolUse
 from ai_agent_toolbox.tool_parser_state import ToolParserState
+from ai_agent_toolbox.parser_utils import IdFactory, uuid4_id
+from ai_agent_toolbox.spilled_arg import SpilledArg
 
 # Name tag constants
 _NAME_START = "<name>"
 _NAME_END = "</name>"
 
+# Enum members bound once: looking them up on the class costs more than the
+# rest of a per-chunk step
+_WAITING_FOR_NAME = ToolParserState.WAITING_FOR_NAME
+_DONE = ToolParserState.DONE
+_TOOL = EventType.TOOL
+_APPEND = EventMode.APPEND
+
+
+class _TagConstants(NamedTuple):
+    start_tag: str
+    end_tag: str
+    # Chars kept while waiting for <name>: a partial <name> or end tag
+    name_lookbehind: int
+
+
+@lru_cache(maxsize=128)
+def _tag_constants(tag: str) -> _TagConstants:
+    """Per-tag strings, shared by parsers for ``tag``; recent tags are kept."""
+    end_tag = f"</{tag}>"
+    return _TagConstants(
+        start_tag=f"<{tag}>",
+        end_tag=end_tag,
+        name_lookbehind=max(len(_NAME_START), len(end_tag)) - 1,
+    )
+
 
 class ToolParseError(ValueError):
     """Raised when tool XML parsing fails.
@@ -37,136 +66,330 @@ class ToolParser:
       - leftover text not consumed in this parse
     """
 
-    def __init__(self, tag: str) -> None:
-        self.state = ToolParserState.WAITING_FOR_NAME
-        self.buffer: str = ""
+    def __init__(
+        self,
+        tag: str,
+        id_factory: IdFactory = uuid4_id,
+        emit_events: bool = True,
+        spill_threshold: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+        lazy_args: bool = False,
+        stats: Optional[ParserStats] = None,
+    ) -> None:
+        if spill_threshold is not None and spill_threshold < 0:
+            raise ValueError("spill_threshold must be at least 0")
+        if lazy_args and spill_threshold is not None:
+            raise ValueError("lazy_args and spill_threshold cannot be combined")
+        self.tag = tag
+        self._id_factory = id_factory
+        # With emit_events=False blocks are still parsed, but no events are built
+        self.emit_events = emit_events
+        # Arguments longer than spill_threshold chars move to a file in spill_dir
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        # Argument values become ArgSpans into the parsed text, and no append
+        # events are built (their content would copy the argument text)
+        self.lazy_args = lazy_args
+        # Block counts go to stats, if given
+        self.stats = stats
+        self.start_tag, self.end_tag, self._name_lookbehind = _tag_constants(tag)
+
         self.events: List[ParserEvent] = []
+        self.current_tool_args: Dict[str, str] = {}
+        self._arg_offsets: Dict[str, Tuple[int, int]] = {}
+        self._arg_chunks: Dict[str, List[str]] = {}  # Collect chunks, join on close
+        self._held: List[str] = []
+        # Spilled arguments of the open tool, and the in-memory size of the
+        # others; only used with a spill_threshold
+        self._spills: Dict[str, SpilledArg] = {}
+        self._arg_chars: Dict[str, int] = {}
+        # Blocks discarded for ending without a <name>, over the parser's life
+        self.nameless_blocks = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Return to the initial state so the parser can take the next block.
+
+        Containers are cleared in place rather than reallocated; nothing they
+        hold has been handed out (closed tools receive their own args dict).
+        """
+        self.state = _WAITING_FOR_NAME
+        self.buffer: str = ""
 
-        self.tag = tag
-        self.end_tag = f"</{tag}>"
-        self.start_tag = f"<{tag}>"
+        # Read cursor into self.buffer while a parse() call is running.
+        self._pos: int = 0
+        # Stream offsets of self.buffer[0] and of the block's start tag
+        self._origin: int = 0
+        self._block_start: Optional[int] = None
+        # Token the parser is blocked on, if any. Chunks that cannot contain it
+        # are held back and joined into the buffer once, when it arrives, so a
+        # long unresolved stretch is neither re-copied nor re-scanned per chunk.
+        self._awaiting: Optional[str] = None
+        self._held.clear()
+        self._held_chars: int = 0
+        self._held_tail: str = ""
+        # Set once the end tag is buffered but the text before it can never be
+        # consumed; no further input can change the outcome.
+        self._stalled: bool = False
 
         # Current tool info
         self.current_tool_id: Optional[str] = None
         self.current_tool_name: Optional[str] = None
         self.current_arg_name: Optional[str] = None
-        self.current_tool_args: Dict[str, str] = {}
-        self._arg_chunks: Dict[str, List[str]] = {}  # Collect chunks, join on close
-
-    def parse(self, chunk: str) -> Tuple[List[ParserEvent], bool, str]:
+        # Stream offsets of the open argument's text so far; merged into
+        # _arg_offsets when the argument closes rather than per append
+        self._arg_start: Optional[int] = None
+        self._arg_end: int = 0
+        self.current_tool_args.clear()
+        self._arg_offsets.clear()
+        self._arg_chunks.clear()
+        # Spilled values of a tool that never closed are not referenced elsewhere
+        for spilled in self._spills.values():
+            spilled.discard()
+        self._spills.clear()
+        self._arg_chars.clear()
+
+    def _release_spills(self) -> None:
+        """Hand spilled values over to the closed tool's args."""
+        for spilled in self._spills.values():
+            spilled._finish()
+        self._spills.clear()
+        self._arg_chars.clear()
+
+    def get_state(self) -> Dict[str, Any]:
+        """Return the parse state between calls as plain data.
+
+        Held and per-argument chunks are joined, so the size is that of the
+        buffered text; spilled arguments are read back into it. :meth:`set_state`
+        puts it back.
+        """
+        return {
+            "state": self.state.value,
+            "buffer": self.buffer,
+            "awaiting": self._awaiting,
+            "held": "".join(self._held),
+            "held_tail": self._held_tail,
+            "stalled": self._stalled,
+            "tool_id": self.current_tool_id,
+            "tool_name": self.current_tool_name,
+            "arg_name": self.current_arg_name,
+            "args": {name: str(value) for name, value in self.current_tool_args.items()},
+            "arg_offsets": {name: list(span) for name, span in self._current_offsets().items()},
+            "block_start": self._block_start,
+            "arg_chunks": {name: "".join(chunks) for name, chunks in self._arg_chunks.items()},
+            "nameless_blocks": self.nameless_blocks,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Resume from the output of :meth:`get_state`."""
+        self.reset()
+        self.state = ToolParserState(state["state"])
+        self.buffer = state["buffer"]
+        self._awaiting = state["awaiting"]
+        if state["held"]:
+            self._held.append(state["held"])
+            self._held_chars = len(state["held"])
+        self._held_tail = state["held_tail"]
+        self._stalled = state["stalled"]
+        self.current_tool_id = state["tool_id"]
+        self.current_tool_name = state["tool_name"]
+        self.current_arg_name = state["arg_name"]
+        self.current_tool_args.update(state["args"])
+        for name, (start, end) in state["arg_offsets"].items():
+            self._arg_offsets[name] = (start, end)
+        self._block_start = state["block_start"]
+        for name, text in state["arg_chunks"].items():
+            self._arg_chunks[name] = [text]
+        if self.spill_threshold is not None:
+            for name, value in self.current_tool_args.items():
+                self._arg_chars[name] = len(value)
+            for name, text in state["arg_chunks"].items():
+                self._arg_chars[name] = self._arg_chars.get(name, 0) + len(text)
+        self.nameless_blocks = state["nameless_blocks"]
+
+    def parse(self, chunk: str, offset: int = 0) -> Tuple[List[ParserEvent], bool, str]:
         """
         Parse the incoming chunk of text according to our current state.
         Returns (events, done, leftover).
         """
-        self.events = []  # reset each parse call
-        self.buffer += chunk
+        events, done, end = self.feed(chunk, 0, offset)
+        leftover = chunk[end:] if done else ""
+        return events, done, leftover
 
-        # Continue parsing until we can no longer make progress
-        while True:
-            before = len(self.buffer)
-
-            if self.state == ToolParserState.WAITING_FOR_NAME:
-                self._parse_waiting_for_name()
-            elif self.state == ToolParserState.HAS_NAME:
-                self._parse_has_name()
-            elif self.state == ToolParserState.DONE:
-                break
-
-            after = len(self.buffer)
-            # If no progress was made, we stop to wait for more data
-            if after == before:
-                break
-
-        # If we are DONE, anything left in buffer is leftover
-        done = (self.state == ToolParserState.DONE)
-        if done and self.buffer:
-            leftover = self.buffer
-            self.buffer = ""
+    def feed(
+        self, text: str, start: int = 0, offset: int = 0
+    ) -> Tuple[List[ParserEvent], bool, int]:
+        """
+        Parse ``text[start:]`` without copying it up front.
+        Returns (events, done, end): once done, ``text[end:]`` was not consumed
+        and belongs to the caller; otherwise ``end`` is ``len(text)``.
+        ``offset`` is the stream offset of ``text[0]``; event offsets are
+        relative to the same origin. The first feed of a block starts right
+        after its start tag.
+        """
+        self.events = []  # reset each parse call
+        if self._block_start is None:
+            self._block_start = offset + start - len(self.start_tag)
+        if self._stalled:
+            return self.events, False, len(text)
+        if self._awaiting is not None:
+            if not self._awaited_token_arrived(text, start):
+                return self.events, False, len(text)
+            self.buffer += "".join(self._held)
+            self._awaiting = None
+            self._held.clear()
+            self._held_chars = 0
+            self._held_tail = ""
+
+        if self.buffer:
+            # Index in text = index in buffer + shift
+            shift = start - len(self.buffer)
+            self.buffer += text[start:]
+            self._pos = 0
         else:
-            leftover = ""
-
-        return self.events, done, leftover
-
-    def _parse_waiting_for_name(self) -> None:
+            shift = 0
+            self.buffer = text
+            self._pos = start
+        self._origin = offset + shift
+
+        try:
+            # Continue parsing until we can no longer make progress
+            while self.state != _DONE:
+                if self.state == _WAITING_FOR_NAME:
+                    progressed = self._parse_waiting_for_name()
+                else:
+                    progressed = self._parse_has_name()
+                if not progressed:
+                    break
+        finally:
+            done = self.state == _DONE
+            if done:
+                # Anything after the end tag is left for the caller
+                end = self._pos + shift
+                self.buffer = ""
+            else:
+                # Drop the consumed prefix once per call rather than per step
+                end = len(text)
+                self.buffer = self.buffer[self._pos:]
+            self._pos = 0
+
+        return self.events, done, end
+
+    def _await(self, token: str) -> None:
+        """Hold further input until ``token`` can be found in it."""
+        self._awaiting = token
+        self._held_tail = self._tail_for(self.buffer[self._pos:], token)
+
+    @staticmethod
+    def _tail_for(text: str, token: str) -> str:
+        """Return the suffix of text that could start a straddling ``token``."""
+        keep = len(token) - 1
+        return text[len(text) - keep:] if len(text) > keep else text
+
+    def _awaited_token_arrived(self, text: str, start: int) -> bool:
+        """Check only the new text (plus a short tail) for the awaited token."""
+        token = self._awaiting
+        if text.find(token, start) != -1:
+            return True
+        head = self._held_tail + text[start:start + len(token) - 1]
+        if token in head:
+            return True
+        if start < len(text):
+            rest = text[start:]
+            self._held.append(rest)
+            self._held_chars += len(rest)
+            self._held_tail = self._tail_for(self._held_tail + rest, token)
+        return False
+
+    def _parse_waiting_for_name(self) -> bool:
         """Look for <name>...</name>. Discard block if tool ends without name."""
-        start_idx = self.buffer.find(_NAME_START)
+        start_idx = self.buffer.find(_NAME_START, self._pos)
         if start_idx == -1:
             # No <name> found; discard block if tool end tag present
-            end_tool_idx = self.buffer.find(self.end_tag)
+            end_tool_idx = self.buffer.find(self.end_tag, self._pos)
             if end_tool_idx != -1:
-                self.buffer = self.buffer[end_tool_idx + len(self.end_tag):]
+                self._pos = end_tool_idx + len(self.end_tag)
                 self.state = ToolParserState.DONE
-            return
+                self.nameless_blocks += 1
+                if self.stats is not None:
+                    self.stats.nameless_blocks += 1
+                return True
+            # Only a partial <name> or end tag at the very end can still match
+            self._pos = max(self._pos, len(self.buffer) - self._name_lookbehind)
+            return False
 
         close_idx = self.buffer.find(_NAME_END, start_idx + len(_NAME_START))
         if close_idx == -1:
-            return  # Partial, wait for more data
+            # Partial, wait for more data. Text before <name> is never used.
+            self._pos = start_idx
+            self._await(_NAME_END)
+            return False
 
         name_text_start = start_idx + len(_NAME_START)
         name_text = self.buffer[name_text_start:close_idx].strip()
-        end_of_block = close_idx + len(_NAME_END)
-        self.buffer = self.buffer[end_of_block:]
+        self._pos = close_idx + len(_NAME_END)
 
         # Create the tool
         self._create_tool(name_text)
         self.state = ToolParserState.HAS_NAME
+        return True
 
-    def _parse_has_name(self) -> None:
+    def _parse_has_name(self) -> bool:
         """
         We have the tool's name. We now look for either:
           - argument tags: <argName>...</argName>
           - the end of the tool: </{self.tag}>
         We'll parse as much as possible. If we cannot find a complete tag, we wait for more data.
         """
-        close_pos = self.buffer.find(self.end_tag)
+        start = self._pos
+        close_pos = self.buffer.find(self.end_tag, start)
         if close_pos == -1:
             # No tool end tag found; parse arguments from entire buffer
-            consumed = self._parse_tool_arguments(self.buffer)
-            # Remove consumed portion from buffer
-            self.buffer = self.buffer[consumed:]
-        else:
-            # We found the tool end tag, so parse arguments up to that point
-            inside_text = self.buffer[:close_pos]
-            consumed = self._parse_tool_arguments(inside_text)
-            if consumed == len(inside_text):
-                # We fully consumed the inside text => remove end tag as well
-                self.buffer = self.buffer[close_pos + len(self.end_tag):]
-                self._finalize_tool()
-                self.state = ToolParserState.DONE
-            else:
-                # Partial parse; only consumed `consumed` chars from inside_text
-                leftover = inside_text[consumed:]
-                # Put back the leftover + the end tag portion
-                self.buffer = leftover + self.buffer[close_pos:]
-
-    def _parse_tool_arguments(self, text: str) -> int:  # noqa: C901
+            self._pos = self._parse_tool_arguments(self.buffer, start, len(self.buffer))
+            if self._pos < len(self.buffer):
+                # Stopped at a "<" without its ">"
+                self._await(">")
+            return self._pos != start
+
+        # We found the tool end tag, so parse arguments up to that point
+        self._pos = self._parse_tool_arguments(self.buffer, start, close_pos)
+        if self._pos == close_pos:
+            # We fully consumed the inside text => remove end tag as well
+            self._pos = close_pos + len(self.end_tag)
+            self._finalize_tool()
+            self.state = ToolParserState.DONE
+            return True
+
+        # A "<" before the end tag never gets its ">"
+        self._stalled = True
+        return False
+
+    def _parse_tool_arguments(self, text: str, start: int, end: int) -> int:  # noqa: C901
         """
-        Parse argument data in `text` and return how many characters we fully consumed.
+        Parse argument data in `text[start:end]` and return the index up to which
+        we fully consumed it.
         Once we see <argName>, we read all text (including nested '<') until </argName>.
         If we see a closing tag </argName>, that ends the current argument.
         We do partial parsing if we don't yet have a closing tag.
         """
-        i = 0
-        length = len(text)
+        i = start
 
-        while i < length:
+        while i < end:
             # Look for a '<'
-            lt_index = text.find("<", i)
+            lt_index = text.find("<", i, end)
             if lt_index == -1:
                 # No more angle brackets -> treat the remainder as text for the current arg
-                remainder = text[i:]
-                self._append_tool_arg(remainder)
-                i = length
+                self._append_tool_arg(text, i, end)
+                i = end
                 break
 
             # Up to the next '<' is literal text for the current arg
             if lt_index > i:
-                literal = text[i:lt_index]
-                self._append_tool_arg(literal)
+                self._append_tool_arg(text, i, lt_index)
                 i = lt_index
 
             # Try to parse a full tag <...>
-            gt_index = text.find(">", lt_index + 1)
+            gt_index = text.find(">", lt_index + 1, end)
             if gt_index == -1:
                 # We have a partial "<..." with no closing '>', so stop here
                 break
@@ -198,13 +421,13 @@ class ToolParser:
 
                 # Find matching close tag
                 close_tag = f"</{arg_name}>"
-                end_pos = text.find(close_tag, i)
+                end_pos = text.find(close_tag, i, end)
                 if end_pos == -1:
-                    self._append_tool_arg(text[i:])
-                    i = length
+                    self._append_tool_arg(text, i, end)
+                    i = end
                     break
                 else:
-                    self._append_tool_arg(text[i:end_pos])
+                    self._append_tool_arg(text, i, end_pos)
                     i = end_pos + len(close_tag)
                     self._close_tool_arg()
 
@@ -217,18 +440,20 @@ class ToolParser:
                 f"Expected: <{self.tag}><name>tool_name</name>...</{self.tag}>"
             )
 
-        self.current_tool_id = str(uuid.uuid4())
+        self.current_tool_id = self._id_factory()
         self.current_tool_name = name
-        self.current_tool_args = {}
 
+        if not self.emit_events:
+            return
         # "Create" event
         self.events.append(
             ParserEvent(
-                type="tool",
-                mode="create",
+                type=EventType.TOOL,
+                mode=EventMode.CREATE,
                 id=self.current_tool_id,
                 is_tool_call=False,
-                content=name
+                content=name,
+                start=self._block_start,
             )
         )
 
@@ -242,47 +467,131 @@ class ToolParser:
             self.current_tool_args[self.current_arg_name] = existing + "".join(chunks)
 
     def _start_tool_arg(self, arg_name: str) -> None:
+        self._close_arg_span()
         self._flush_arg_chunks()
         self.current_arg_name = arg_name
 
-    def _append_tool_arg(self, text: str) -> None:
-        if not (self.current_tool_id and self.current_arg_name and text):
+    def _close_arg_span(self) -> None:
+        """Merge the open argument's offsets into ``_arg_offsets``."""
+        if self._arg_start is not None:
+            self._arg_offsets[self.current_arg_name] = self._open_arg_span()
+            self._arg_start = None
+
+    def _current_offsets(self) -> Dict[str, Tuple[int, int]]:
+        """Return ``_arg_offsets`` including the open argument, without closing it."""
+        if self._arg_start is None:
+            return self._arg_offsets
+        offsets = dict(self._arg_offsets)
+        offsets[self.current_arg_name] = self._open_arg_span()
+        return offsets
+
+    def _open_arg_span(self) -> Tuple[int, int]:
+        # A repeated argument keeps the start of its first occurrence
+        known = self._arg_offsets.get(self.current_arg_name)
+        return (self._arg_start if known is None else known[0], self._arg_end)
+
+    def _append_tool_arg(self, text: str, start: int, end: int) -> None:
+        """Add ``text[start:end]`` to the current argument."""
+        if not (self.current_tool_id and self.current_arg_name and start < end):
+            return
+        span_start = self._origin + start
+        span_end = self._origin + end
+        if self._arg_start is None:
+            self._arg_start = span_start
+        self._arg_end = span_end
+        if self.lazy_args:
+            self._append_span(self.current_arg_name, text, start, end)
+            return
+        piece = text[start:end]
+        if self.spill_threshold is None:
+            self._arg_chunks.setdefault(self.current_arg_name, []).append(piece)
+        else:
+            self._append_spillable(self.current_arg_name, piece)
+        if not self.emit_events:
             return
-        self._arg_chunks.setdefault(self.current_arg_name, []).append(text)
+        # Positional, in field order (type, mode, id, tool, is_tool_call,
+        # content, tag, start, end): keywords cost twice as much per event
         self.events.append(
             ParserEvent(
-                type="tool",
-                mode="append",
-                id=self.current_tool_id,
-                is_tool_call=False,
-                content=text
+                _TOOL, _APPEND, self.current_tool_id, None, False, piece, None, span_start, span_end
             )
         )
 
+    def _append_span(self, name: str, text: str, start: int, end: int) -> None:
+        """Add ``text[start:end]`` to argument ``name`` as a span where possible."""
+        value = self.current_tool_args.get(name)
+        if value is None:
+            self.current_tool_args[name] = ArgSpan(text, start, end)
+        elif isinstance(value, ArgSpan) and value.source is text and value.end == start:
+            # Not handed out yet, so it can grow in place
+            value.end = end
+        else:
+            # Pieces from different chunks, or a repeated argument
+            self.current_tool_args[name] = str(value) + text[start:end]
+
+    def _append_spillable(self, name: str, text: str) -> None:
+        """Add ``text`` to argument ``name``, moving it to a file once too long."""
+        spilled = self._spills.get(name)
+        if spilled is not None:
+            spilled._write(text)
+            return
+        chunks = self._arg_chunks.setdefault(name, [])
+        chunks.append(text)
+        size = self._arg_chars.get(name)
+        if size is None:
+            # A repeated argument continues its earlier value
+            size = len(self.current_tool_args.get(name, ""))
+        size += len(text)
+        if size <= self.spill_threshold:
+            self._arg_chars[name] = size
+            return
+
+        spilled = SpilledArg(self.spill_dir)
+        spilled._write(self.current_tool_args.get(name, ""))
+        for chunk in chunks:
+            spilled._write(chunk)
+        del self._arg_chunks[name]
+        self._arg_chars.pop(name, None)
+        self._spills[name] = spilled
+        self.current_tool_args[name] = spilled
+
     def _close_tool_arg(self) -> None:
+        self._close_arg_span()
         self._flush_arg_chunks()
         self.current_arg_name = None
 
     def _finalize_tool(self) -> None:
         """Emit a close event with the final tool usage."""
         self._close_tool_arg()
-        if self.current_tool_id:
+        if self.stats is not None:
+            self.stats.tool_blocks += 1
+        if self.current_tool_id and self.emit_events:
             self.events.append(
                 ParserEvent(
-                    type="tool",
-                    mode="close",
+                    type=EventType.TOOL,
+                    mode=EventMode.CLOSE,
                     id=self.current_tool_id,
                     is_tool_call=True,
                     tool=ToolUse(
                         name=self.current_tool_name,
-                        args=self.current_tool_args.copy()
-                    )
+                        args=self.current_tool_args,
+                        offsets=self._arg_offsets,
+                    ),
+                    start=self._block_start,
+                    end=self._origin + self._pos,
                 )
             )
+            # The closed tool owns the args and offsets dicts now
+            self.current_tool_args = {}
+            self._arg_offsets = {}
+            self._release_spills()
         self.current_tool_id = None
         self.current_tool_name = None
-        self.current_tool_args = {}
-        self._arg_chunks = {}
+        self._arg_chunks.clear()
+
+    def buffered_chars(self) -> int:
+        """Return how many characters of input are held between calls."""
+        return len(self.buffer) + self._held_chars
 
     def is_done(self) -> bool:
         return self.state == ToolParserState.DONE
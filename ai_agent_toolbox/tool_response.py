@@ -1,8 +1,13 @@
 from dataclasses import dataclass
 from typing import Any, Optional
+
+from ._compat import DATACLASS_SLOTS
 from .tool_use import ToolUse
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ToolResponse:
     tool: ToolUse
     result: Optional[Any] = None
+    # Exception raised by the call, when reported instead of raised
+    # (Toolbox.use_many); result is then None
+    error: Optional[BaseException] = None
@@ -1,7 +1,14 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
-@dataclass
+from ._compat import DATACLASS_SLOTS
+
+@dataclass(**DATACLASS_SLOTS)
 class ToolUse:
     name: str
     args: Dict[str, Any] = field(default_factory=dict)
+    # (start, end) character offsets of each argument value in the parsed
+    # stream, when produced by a parser. Not compared by ==. An argument
+    # given more than once spans from its first value to its last, tags
+    # in between included.
+    offsets: Dict[str, Tuple[int, int]] = field(default_factory=dict, compare=False)
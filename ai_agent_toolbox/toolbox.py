@@ -1,15 +1,57 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
 import json
-from typing import Any, Callable, Dict, Optional, Union
-
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from functools import partial
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .arg_span import ArgSpan
 from .parser_event import ParserEvent
+from .spilled_arg import SpilledArg
+from .tool_limiter import ToolLimiter, ToolLimitStats
 from .tool_response import ToolResponse
 
 # Type alias for argument schema: can be a string like "int" or a dict with type/description/etc
 ArgSchema = Union[str, Dict[str, Any]]
 
+# Converts one raw argument value, raising ValueError/TypeError when invalid
+ArgConverter = Callable[[Any], Any]
+
+# How sync tools are run: in the caller, in a thread pool, or in a process pool
+EXECUTIONS = ("inline", "thread", "process")
+
+# Default cap on the characters of a SpilledArg read to convert it
+MAX_SPILLED_CHARS = 1 << 20
+
+# Threads use_many starts without a max_concurrency, as in concurrent.futures
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
 # Bool coercion constants
 _TRUTHY = frozenset(("true", "1", "yes", "y", "on"))
 _FALSY = frozenset(("false", "0", "no", "n", "off"))
@@ -29,6 +71,72 @@ def _coerce_bool(value: Any) -> bool:
             return False
     raise ValueError(f"Cannot convert value {value!r} to bool")
 
+def _call(fn: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+    """Call ``fn(**kwargs)``; module level so process pools can pickle it."""
+    return fn(**kwargs)
+
+
+def _start_thread(fn: Callable[..., Any], kwargs: Dict[str, Any]) -> Future:
+    """Call ``fn(**kwargs)`` in a new daemon thread, which may be abandoned."""
+    future: Future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run() -> None:
+        try:
+            future.set_result(fn(**kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _call_in_child(connection: Connection, fn: Callable[..., Any], kwargs: Dict[str, Any]) -> None:
+    """Process target: send ``(succeeded, result or exception)`` of ``fn(**kwargs)``."""
+    with connection:
+        try:
+            outcome = (True, fn(**kwargs))
+        except BaseException as exc:
+            outcome = (False, exc)
+        try:
+            connection.send(outcome)
+        except Exception as exc:
+            # The result or exception could not be pickled
+            connection.send((False, RuntimeError(f"Cannot return the tool's outcome: {exc!r}")))
+
+
+def _start_process(fn: Callable[..., Any], kwargs: Dict[str, Any]) -> Tuple[Future, BaseProcess]:
+    """Call ``fn(**kwargs)`` in a new process, which may be terminated.
+
+    The future is completed by a daemon thread reading the outcome; it fails
+    with RuntimeError if the process exits without one.
+    """
+    context = multiprocessing.get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_call_in_child, args=(sender, fn, kwargs), daemon=True)
+    process.start()
+    sender.close()
+    future: Future = Future()
+    future.set_running_or_notify_cancel()
+
+    def collect() -> None:
+        with receiver:
+            try:
+                succeeded, value = receiver.recv()
+            except EOFError:
+                succeeded, value = False, None
+        process.join()
+        if succeeded:
+            future.set_result(value)
+        else:
+            future.set_exception(
+                value or RuntimeError(f"Tool process exited with code {process.exitcode}")
+            )
+
+    threading.Thread(target=collect, daemon=True).start()
+    return future, process
+
+
 class ToolConflictError(Exception):
     """Raised when trying to register a tool name that already exists."""
 
@@ -52,9 +160,52 @@ class ToolArgumentError(ValueError):
         self.arg_name = arg_name
         super().__init__(f"Tool '{tool_name}' argument '{arg_name}': {message}")
 
+
+class ToolTimeoutError(TimeoutError):
+    """Raised when a tool call exceeds its timeout or the caller's deadline.
+
+    Attributes:
+        tool_name: The name of the tool being invoked.
+        timeout: The seconds the call was allowed, including any wait for
+            the tool's limits; zero or less when the deadline had already
+            passed and the tool was not started.
+    """
+
+    def __init__(self, tool_name: str, timeout: float) -> None:
+        self.tool_name = tool_name
+        self.timeout = timeout
+        super().__init__(f"Tool '{tool_name}' timed out after {max(timeout, 0):.3g}s")
+
 class Toolbox:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        execution: str = "inline",
+        thread_executor: Optional[Executor] = None,
+        process_executor: Optional[Executor] = None,
+        max_spilled_chars: int = MAX_SPILLED_CHARS,
+    ) -> None:
+        """Create a toolbox.
+
+        Args:
+            execution: Default execution policy for sync tools, one of
+                ``EXECUTIONS``; see :meth:`add_tool`.
+            thread_executor: Executor for ``"thread"`` tools (default: the
+                event loop's default executor).
+            process_executor: Executor for ``"process"`` tools (default: a
+                ``ProcessPoolExecutor`` created on first use and shut down by
+                :meth:`shutdown`).
+            max_spilled_chars: Longest :class:`SpilledArg` read into memory
+                to convert it to a non-string type; longer ones fail with
+                :class:`ToolArgumentError`. ``"string"`` arguments receive
+                the ``SpilledArg`` itself, unread.
+        """
+        self._check_execution(execution)
         self._tools: Dict[str, Dict[str, Any]] = {}
+        self.execution = execution
+        self._thread_executor = thread_executor
+        self._process_executor = process_executor
+        self._owns_process_executor = False
+        self.max_spilled_chars = max_spilled_chars
 
     def add_tool(
         self,
@@ -62,73 +213,420 @@ class Toolbox:
         fn: Callable[..., Any],
         args: Dict[str, ArgSchema],
         description: str = "",
+        execution: Optional[str] = None,
+        executor: Optional[Executor] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
     ) -> None:
+        """Register ``fn`` as tool ``name``.
+
+        ``execution`` chooses how a sync tool runs (default: the toolbox's
+        policy):
+
+        - ``"inline"`` (the default): called directly, also by
+          :meth:`use_async`, which blocks the event loop for the duration of
+          the call. Cheapest for fast tools.
+        - ``"thread"``: :meth:`use_async` runs it in a thread pool, so the
+          loop keeps serving other tasks. :meth:`use` calls it directly.
+        - ``"process"``: run in a process pool, for CPU-bound tools. ``fn``
+          and its converted arguments and result must be picklable. Only
+          those cross the process boundary, not the event or raw arguments.
+
+        ``executor`` replaces the toolbox's executor for this tool. Async
+        tools always run on the caller's event loop.
+
+        A call taking longer than ``timeout`` seconds raises
+        :class:`ToolTimeoutError`. Async tools are cancelled; a thread cannot
+        be interrupted, so the caller stops waiting and the result is
+        discarded. A process tool call with a timeout runs in a process of its
+        own, started for the call and terminated on timeout, so other calls
+        are unaffected; with an executor passed in, the call runs there and
+        keeps its worker busy until it returns. Inline sync tools cannot have
+        a timeout.
+
+        ``max_concurrency`` limits the calls running at once, and ``rate``
+        the calls started per second, allowing bursts of ``burst`` calls
+        (default: one second's worth). Calls beyond them wait their turn,
+        across all callers of this toolbox in any thread or event loop, and
+        whichever ``use`` method they call. Waiting counts against a
+        ``deadline`` but not against ``timeout``. See :meth:`limit_stats`
+        for queue depth and wait times.
+        """
         if name in self._tools:
             raise ToolConflictError(f"Tool {name} already registered")
-
-        # Store whether the function is async
+        is_async = inspect.iscoroutinefunction(fn)
+        if execution is None:
+            execution = "inline" if is_async else self.execution
+        self._check_execution(execution)
+        if is_async and execution != "inline":
+            raise ValueError(f"Async tool {name} cannot use execution {execution!r}")
+        if timeout is not None:
+            if timeout <= 0:
+                raise ValueError("timeout must be positive")
+            if execution == "inline" and not is_async:
+                raise ValueError(f"Inline tool {name} cannot have a timeout")
+        limiter = None
+        if max_concurrency is not None or rate is not None or burst is not None:
+            limiter = ToolLimiter(max_concurrency, rate, burst)
+
+        # Store whether the function is async, and each argument's schema
+        # compiled into one converter so calls skip re-reading it
         self._tools[name] = {
+            "name": name,
             "fn": fn,
-            "is_async": inspect.iscoroutinefunction(fn),
+            "is_async": is_async,
+            "execution": execution,
+            "executor": executor,
+            "timeout": timeout,
+            "limiter": limiter,
             "args": args,
             "description": description,
+            "converters": [
+                (arg_name, self._compile_arg(arg_schema, self.max_spilled_chars))
+                for arg_name, arg_schema in args.items()
+            ],
         }
 
-    def use(self, event: ParserEvent) -> Optional[ToolResponse]:
-        """For sync tool execution only"""
+    def use(self, event: ParserEvent, deadline: Optional[float] = None) -> Optional[ToolResponse]:
+        """For sync tool execution only.
+
+        ``deadline`` is a :func:`time.monotonic` time by which the call must
+        finish, as for the tool's timeout; the earlier of the two applies.
+        An inline tool is not started once the deadline has passed, but runs
+        to completion once started, as it cannot be timed out.
+        """
         tool_data = self._get_tool_data(event)
         if not tool_data:
             return None
+        tool, processed_args = tool_data
 
-        if tool_data["is_async"]:
+        if tool["is_async"]:
             raise RuntimeError(f"Async tool {event.tool.name} called with sync use(). Call use_async() instead.")
 
-        tool_result = tool_data["fn"](**tool_data["processed_args"])
+        tool_result = self._run(tool, processed_args, deadline)
         return ToolResponse(
             tool=event.tool,
             result=tool_result
         )
 
-    async def use_async(self, event: ParserEvent) -> Optional[ToolResponse]:
-        """For both sync and async tools"""
+    async def use_async(
+        self, event: ParserEvent, deadline: Optional[float] = None
+    ) -> Optional[ToolResponse]:
+        """For both sync and async tools. ``deadline`` is as for :meth:`use`."""
         tool_data = self._get_tool_data(event)
         if not tool_data:
             return None
-        if tool_data["is_async"]:
-            tool_result = await tool_data["fn"](**tool_data["processed_args"])
-        else:
-            tool_result = tool_data["fn"](**tool_data["processed_args"])
+        tool, processed_args = tool_data
+        tool_result = await self._run_async(tool, processed_args, deadline)
         return ToolResponse(
             tool=event.tool,
             result=tool_result
         )
 
-    def _get_tool_data(self, event: ParserEvent) -> Optional[Dict[str, Any]]:
-        """Shared validation and argument processing."""
+    def use_many(
+        self,
+        events: Iterable[ParserEvent],
+        max_concurrency: Optional[int] = None,
+        ordered: bool = True,
+        deadline: Optional[float] = None,
+    ) -> Iterator[ToolResponse]:
+        """Run the tool calls among ``events`` concurrently in threads.
+
+        Events that :meth:`use` would ignore are skipped. At most
+        ``max_concurrency`` calls run at once (default:
+        ``DEFAULT_MAX_WORKERS``, i.e. ``min(32, os.cpu_count() + 4)``), each
+        in its own thread. Async tools run to completion in their thread. Responses are yielded
+        in the order of ``events``, or as calls complete with
+        ``ordered=False``. An exception raised by a call, including a
+        :class:`ToolArgumentError`, is reported as the ``error`` of its
+        response and does not affect the other calls.
+
+        ``deadline`` is a :func:`time.monotonic` time shared by all the calls:
+        each must finish by then as well as within its tool's timeout, or its
+        response's ``error`` is a :class:`ToolTimeoutError`. Calls still
+        waiting for a worker at the deadline are not started.
+
+        Calls start when iteration starts. Closing the iterator early cancels
+        the calls that have not started and waits for the running ones.
+        """
+        calls = self._tool_calls(events, max_concurrency)
+        if not calls:
+            return
+        workers = min(max_concurrency or DEFAULT_MAX_WORKERS, len(calls))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._respond, event, deadline) for event in calls]
+            try:
+                for future in futures if ordered else as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    async def use_many_async(
+        self,
+        events: Iterable[ParserEvent],
+        max_concurrency: Optional[int] = None,
+        ordered: bool = True,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[ToolResponse]:
+        """Async version of :meth:`use_many`, running calls as tasks.
+
+        Sync tools run in a thread pool, as in :meth:`use_many`, or in the
+        process pool with the ``"process"`` policy, so they overlap with each
+        other and with async tools. Without ``max_concurrency`` every call
+        starts at once as a task, and sync tools queue for their pool's
+        workers. Closing the iterator early, or cancelling its consumer,
+        cancels the calls still pending.
+        """
+        calls = self._tool_calls(events, max_concurrency)
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def respond(event: ParserEvent) -> ToolResponse:
+            if semaphore is None:
+                return await self._respond_async(event, deadline)
+            async with semaphore:
+                return await self._respond_async(event, deadline)
+
+        tasks = [asyncio.ensure_future(respond(event)) for event in calls]
+        try:
+            for next_task in tasks if ordered else asyncio.as_completed(tasks):
+                yield await next_task
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def _tool_calls(
+        self, events: Iterable[ParserEvent], max_concurrency: Optional[int]
+    ) -> List[ParserEvent]:
+        """Return the events naming a registered tool, for :meth:`use_many`."""
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        return [
+            event
+            for event in events
+            if event.is_tool_call and event.tool and event.tool.name in self._tools
+        ]
+
+    def _respond(self, event: ParserEvent, deadline: Optional[float]) -> ToolResponse:
+        """Run one call in a worker thread, reporting its exception."""
+        try:
+            tool, processed_args = self._get_tool_data(event)
+            if tool["is_async"]:
+                result = asyncio.run(self._run_async(tool, processed_args, deadline))
+            else:
+                result = self._run(tool, processed_args, deadline)
+        except Exception as exc:
+            return ToolResponse(tool=event.tool, error=exc)
+        return ToolResponse(tool=event.tool, result=result)
+
+    async def _respond_async(self, event: ParserEvent, deadline: Optional[float]) -> ToolResponse:
+        """Run one call as a task, reporting its exception."""
+        try:
+            tool, processed_args = self._get_tool_data(event)
+            result = await self._run_async(tool, processed_args, deadline, concurrent=True)
+        except asyncio.CancelledError:
+            # An Exception subclass before Python 3.8
+            raise
+        except Exception as exc:
+            return ToolResponse(tool=event.tool, error=exc)
+        return ToolResponse(tool=event.tool, result=result)
+
+    @staticmethod
+    def _limit(tool: Dict[str, Any], deadline: Optional[float]) -> Optional[float]:
+        """Return the seconds a call may take, raising if none are left."""
+        limit = tool["timeout"]
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ToolTimeoutError(tool["name"], remaining)
+            if limit is None or remaining < limit:
+                limit = remaining
+        return limit
+
+    def _run(
+        self, tool: Dict[str, Any], processed_args: Dict[str, Any], deadline: Optional[float]
+    ) -> Any:
+        """Run a sync tool from a blocking caller once its limits admit the call."""
+        limiter = tool["limiter"]
+        if limiter is None:
+            return self._call(tool, processed_args, self._limit(tool, deadline))
+        queued = time.monotonic()
+        if not limiter.acquire(deadline):
+            # Report the time the call had, not what was left after waiting
+            raise ToolTimeoutError(tool["name"], deadline - queued)
+        try:
+            return self._call(tool, processed_args, self._limit(tool, deadline))
+        finally:
+            limiter.release()
+
+    async def _run_async(
+        self,
+        tool: Dict[str, Any],
+        processed_args: Dict[str, Any],
+        deadline: Optional[float],
+        concurrent: bool = False,
+    ) -> Any:
+        """Run a tool from the event loop once its limits admit the call.
+
+        With ``concurrent``, inline sync tools run in the thread executor.
+        """
+        limiter = tool["limiter"]
+        if limiter is None:
+            return await self._call_async(
+                tool, processed_args, self._limit(tool, deadline), concurrent
+            )
+        queued = time.monotonic()
+        if not await limiter.acquire_async(deadline):
+            # Report the time the call had, not what was left after waiting
+            raise ToolTimeoutError(tool["name"], deadline - queued)
+        try:
+            return await self._call_async(
+                tool, processed_args, self._limit(tool, deadline), concurrent
+            )
+        finally:
+            limiter.release()
+
+    def _call(
+        self, tool: Dict[str, Any], processed_args: Dict[str, Any], limit: Optional[float] = None
+    ) -> Any:
+        """Run a sync tool from a blocking caller, per its execution policy.
+
+        Thread tools are called directly unless they have a time limit.
+        """
+        execution = tool["execution"]
+        if execution == "inline" or (execution == "thread" and limit is None):
+            return tool["fn"](**processed_args)
+        process = None
+        if self._runs_alone(tool, limit):
+            future, process = _start_process(tool["fn"], processed_args)
+        else:
+            executor = self._executor_for(tool)
+            if executor is None:
+                future = _start_thread(tool["fn"], processed_args)
+            else:
+                future = executor.submit(_call, tool["fn"], processed_args)
+        if not wait((future,), limit).done:
+            future.cancel()
+            if process is not None:
+                process.terminate()
+            raise ToolTimeoutError(tool["name"], limit)
+        return future.result()
+
+    async def _call_async(
+        self,
+        tool: Dict[str, Any],
+        processed_args: Dict[str, Any],
+        limit: Optional[float] = None,
+        concurrent: bool = False,
+    ) -> Any:
+        """Run a tool from the event loop, per its execution policy."""
+        process = None
+        if tool["is_async"]:
+            if limit is None:
+                return await tool["fn"](**processed_args)
+            future = asyncio.ensure_future(tool["fn"](**processed_args))
+        elif tool["execution"] == "inline" and not concurrent:
+            return tool["fn"](**processed_args)
+        elif self._runs_alone(tool, limit):
+            pending, process = _start_process(tool["fn"], processed_args)
+            future = asyncio.wrap_future(pending)
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self._executor_for(tool), _call, tool["fn"], processed_args
+            )
+            if limit is None:
+                return await future
+        try:
+            done, _ = await asyncio.wait((future,), timeout=limit)
+        except asyncio.CancelledError:
+            future.cancel()
+            if process is not None:
+                process.terminate()
+            raise
+        if not done:
+            future.cancel()
+            if process is not None:
+                process.terminate()
+            raise ToolTimeoutError(tool["name"], limit)
+        return future.result()
+
+    def _executor_for(self, tool: Dict[str, Any]) -> Optional[Executor]:
+        """Return the executor for a sync tool run off the caller (None: loop default)."""
+        if tool["executor"] is not None:
+            return tool["executor"]
+        if tool["execution"] != "process":
+            return self._thread_executor
+        if self._process_executor is None:
+            self._process_executor = ProcessPoolExecutor()
+            self._owns_process_executor = True
+        return self._process_executor
+
+    def _runs_alone(self, tool: Dict[str, Any], limit: Optional[float]) -> bool:
+        """Return whether a call gets a process of its own, to stop it on timeout.
+
+        That is a process tool call with a time limit that would otherwise go
+        to the toolbox's own pool. Executors passed in are always used.
+        """
+        return (
+            limit is not None
+            and tool["execution"] == "process"
+            and tool["executor"] is None
+            and (self._process_executor is None or self._owns_process_executor)
+        )
+
+    def limit_stats(self) -> Dict[str, ToolLimitStats]:
+        """Return the live counters of each tool with ``max_concurrency`` or ``rate``."""
+        return {
+            name: tool["limiter"].stats
+            for name, tool in self._tools.items()
+            if tool["limiter"] is not None
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the process pool the toolbox created, if any."""
+        if self._owns_process_executor:
+            self._process_executor.shutdown(wait=wait)
+            self._process_executor = None
+            self._owns_process_executor = False
+
+    @staticmethod
+    def _check_execution(execution: str) -> None:
+        if execution not in EXECUTIONS:
+            raise ValueError(f"Unknown execution {execution!r}; expected one of {EXECUTIONS}")
+
+    def _get_tool_data(
+        self, event: ParserEvent
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Shared validation and argument processing.
+
+        Returns the registered tool and its converted arguments.
+        """
         if not event.is_tool_call or not event.tool:
             return None
 
         tool_name = event.tool.name
-        if tool_name not in self._tools:
+        tool = self._tools.get(tool_name)
+        if tool is None:
             return None
 
-        tool_data = {**self._tools[tool_name]}  # Shallow copy
+        raw_args = event.tool.args
         processed_args: Dict[str, Any] = {}
-
-        for arg_name, arg_schema in tool_data["args"].items():
-            if arg_name not in event.tool.args:
+        for arg_name, convert in tool["converters"]:
+            if arg_name not in raw_args:
                 # Argument not provided - skip it (allows optional arguments)
                 continue
-
-            raw_value = event.tool.args[arg_name]
-            schema_dict = self._normalize_arg_schema(arg_schema)
             try:
-                processed_args[arg_name] = self._convert_arg(raw_value, schema_dict)
+                processed_args[arg_name] = convert(raw_args[arg_name])
             except (ValueError, TypeError) as exc:
                 raise ToolArgumentError(tool_name, arg_name, str(exc)) from exc
 
-        tool_data["processed_args"] = processed_args
-        return tool_data
+        return tool, processed_args
 
     @staticmethod
     def _normalize_arg_schema(arg_schema: Any) -> Dict[str, Any]:
@@ -138,43 +636,70 @@ class Toolbox:
             return {"type": arg_schema}
         raise TypeError(f"Argument schema must be a dict or string, got {type(arg_schema)!r}")
 
-    @staticmethod
-    def _convert_arg(value: Any, arg_schema: Dict[str, Any]) -> Any:
-        """Converts arguments to specified types with validation and custom parsing"""
-        arg_type = arg_schema.get("type", "string")
+    @classmethod
+    def _compile_arg(
+        cls, arg_schema: Any, max_spilled_chars: int = MAX_SPILLED_CHARS
+    ) -> ArgConverter:
+        """Build the converter for one argument schema.
+
+        The converter coerces to the declared type, applies the custom parser
+        and validates choices and bounds, in that order. Schema errors, such
+        as a parser that is not callable, are raised here. An ``ArgSpan`` is
+        converted to ``str`` before anything else. A ``SpilledArg``
+        is passed through for ``"string"`` and otherwise read into memory
+        first, if it has at most ``max_spilled_chars`` characters.
+        """
+        schema = cls._normalize_arg_schema(arg_schema)
+        arg_type = schema.get("type", "string")
         if isinstance(arg_type, str):
             arg_type = arg_type.lower()
+        coerce = cls._coercer_for(arg_type)
+
+        parser = schema.get("parser")
+        if parser is not None and not callable(parser):
+            raise TypeError("Parser specified in arg schema must be callable")
+
+        checks = cls._compile_checks(schema)
+
+        def convert(value: Any) -> Any:
+            if value.__class__ is ArgSpan:
+                value = str(value)
+            elif value.__class__ is SpilledArg and arg_type != "string":
+                if len(value) > max_spilled_chars:
+                    raise ValueError(
+                        f"Spilled value of {len(value)} characters exceeds the "
+                        f"{max_spilled_chars}-character limit for {arg_type!r} arguments"
+                    )
+                value = value.read()
+            if coerce is not None:
+                value = coerce(value)
+            if parser is not None:
+                value = parser(value)
+            for check in checks:
+                check(value)
+            return value
 
-        converted = Toolbox._coerce_type(value, arg_type)
-
-        parser = arg_schema.get("parser")
-        if parser is not None:
-            if not callable(parser):
-                raise TypeError("Parser specified in arg schema must be callable")
-            converted = parser(converted)
-
-        Toolbox._validate_value(converted, arg_schema)
-
-        return converted
+        return convert
 
     # Type coercion dispatch table - O(1) lookup vs if-chain
     _COERCERS: Dict[str, Callable[[Any], Any]] = {
         "int": int,
         "float": float,
         "bool": _coerce_bool,
-        "string": lambda v: v if isinstance(v, str) else str(v),
+        # A SpilledArg stays on disk; the tool can stream it
+        "string": lambda v: v if isinstance(v, (str, SpilledArg)) else str(v),
     }
 
     @classmethod
-    def _coerce_type(cls, value: Any, arg_type: str) -> Any:
+    def _coercer_for(cls, arg_type: Any) -> Optional[Callable[[Any], Any]]:
+        """Return the coercion for ``arg_type``, or None to pass values through."""
         if arg_type == "list":
-            return cls._load_json_container(value, list)
+            return partial(cls._load_json_container, expected_type=list)
         if arg_type == "dict":
-            return cls._load_json_container(value, dict)
+            return partial(cls._load_json_container, expected_type=dict)
         if arg_type == "enum":
-            return cls._maybe_parse_json(value)
-        coercer = cls._COERCERS.get(arg_type)
-        return coercer(value) if coercer else value
+            return cls._maybe_parse_json
+        return cls._COERCERS.get(arg_type)
 
     @staticmethod
     def _maybe_parse_json(value: Any) -> Any:
@@ -205,21 +730,55 @@ class Toolbox:
         return parsed
 
     @staticmethod
-    def _validate_value(value: Any, arg_schema: Dict[str, Any]) -> None:
+    def _compile_checks(arg_schema: Dict[str, Any]) -> List[Callable[[Any], None]]:
+        """Return the validations declared by ``arg_schema``, in order."""
+        checks: List[Callable[[Any], None]] = []
+
         choices = arg_schema.get("choices")
-        if choices is not None and value not in choices:
-            raise ValueError(f"Value {value!r} not in allowed choices: {choices!r}")
+        if choices is not None:
+            allowed = choices
+            # Only plain collections become a set; other containers, such as
+            # a range or a str, keep their own (possibly lazy) membership test
+            if isinstance(choices, (list, tuple, set, frozenset)):
+                try:
+                    allowed = frozenset(choices)
+                except TypeError:
+                    # Unhashable choices, e.g. dicts, are scanned
+                    pass
+
+            def check_choices(value: Any) -> None:
+                try:
+                    found = value in allowed
+                except TypeError:
+                    # Unhashable value, e.g. a list
+                    found = value in choices
+                if not found:
+                    raise ValueError(f"Value {value!r} not in allowed choices: {choices!r}")
+
+            checks.append(check_choices)
+
         min_value = arg_schema.get("min")
         if min_value is not None:
-            try:
-                if value < min_value:
-                    raise ValueError(f"Value {value!r} is less than minimum {min_value!r}")
-            except TypeError as exc:
-                raise TypeError(f"Cannot compare value {value!r} with minimum {min_value!r}") from exc
+
+            def check_min(value: Any) -> None:
+                try:
+                    if value < min_value:
+                        raise ValueError(f"Value {value!r} is less than minimum {min_value!r}")
+                except TypeError as exc:
+                    raise TypeError(f"Cannot compare value {value!r} with minimum {min_value!r}") from exc
+
+            checks.append(check_min)
+
         max_value = arg_schema.get("max")
         if max_value is not None:
-            try:
-                if value > max_value:
-                    raise ValueError(f"Value {value!r} exceeds maximum {max_value!r}")
-            except TypeError as exc:
-                raise TypeError(f"Cannot compare value {value!r} with maximum {max_value!r}") from exc
+
+            def check_max(value: Any) -> None:
+                try:
+                    if value > max_value:
+                        raise ValueError(f"Value {value!r} exceeds maximum {max_value!r}")
+                except TypeError as exc:
+                    raise TypeError(f"Cannot compare value {value!r} with maximum {max_value!r}") from exc
+
+            checks.append(check_max)
+
+        return checks
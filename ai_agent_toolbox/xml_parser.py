@@ -1,13 +1,34 @@
 from __future__ import annotations
 
-from typing import List
+import codecs
+import json
+import time
+from concurrent.futures import Executor
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
 from ai_agent_toolbox.tool_parser import ToolParser
 from ai_agent_toolbox.tool_parser_state import ToolParserState
 from ai_agent_toolbox.parser import Parser
-from ai_agent_toolbox.parser_event import ParserEvent
+from ai_agent_toolbox.parser_event import EventMode, EventType, ParserEvent
+from ai_agent_toolbox.parser_stats import ParserStats
 from ai_agent_toolbox.tool_use import ToolUse
-from ai_agent_toolbox.parser_utils import TextEventStream
+from ai_agent_toolbox.parser_utils import (
+    CounterIdFactory,
+    EventCoalescer,
+    IdFactory,
+    TagMatcher,
+    TextEventStream,
+    counter_id_factory,
+    tag_matcher,
+    uuid4_id,
+)
+
+# Snapshot bytes: magic, one version byte, then UTF-8 JSON
+_SNAPSHOT_MAGIC = b"AATXP"
+_SNAPSHOT_VERSION = 1
+
+# UTF-8 continuation bytes; every other byte starts a character
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
 
 
 class XMLParser(Parser):
@@ -15,96 +36,512 @@ class XMLParser(Parser):
     Accumulates text until <use_tool>, then delegates to ToolParser.
     Once we detect <use_tool>, we shift into INSIDE_TOOL state and feed
     chunks to our ToolParser until it signals completion or we run out of data.
+
+    Optional ``block_tags`` (e.g. ``("think", "answer")``) are detected in the
+    same scan. Their contents are emitted as ``type="block"`` events carrying
+    the tag, and are not parsed further until the matching close tag.
+
+    With ``coalesce=True``, adjacent ``append`` events for the same id are
+    merged within each ``parse_chunk`` call. ``coalesce_min_chars`` and
+    ``coalesce_max_delay`` (seconds) additionally hold merged appends back
+    across calls until either threshold is reached; ``create``/``close`` events
+    are never delayed. Either threshold implies ``coalesce=True``.
+
+    Event ids come from ``id_factory``. The default is a per-parser random
+    prefix plus a counter, which is unique within the stream; pass
+    ``parser_utils.uuid4_id`` for globally unique UUID4 ids.
+
+    ``event_types`` restricts which event types are produced, e.g.
+    ``{"tool"}`` for a tools-only parse. Filtered events are never built: text
+    outside tags is skipped without being sliced or stored beyond the partial
+    tag held between chunks, while tool and block structure is still tracked.
+
+    With ``spill_threshold`` set, a tool argument longer than that many
+    characters is moved to a temporary file (in ``spill_dir``, default the
+    system temp directory) as it streams in, and its value in the closed
+    ``ToolUse.args`` is a lazy :class:`~ai_agent_toolbox.SpilledArg`. At most
+    ``spill_threshold`` characters per argument are then held in memory.
+
+    ``lazy_args=True`` is meant for parsing complete text. Argument values in
+    ``ToolUse.args`` are then :class:`~ai_agent_toolbox.ArgSpan` views into
+    the parsed string that copy nothing until converted with ``str()``, and
+    tool ``append`` events are not produced. An argument split across chunks
+    is joined into a plain ``str``.
+
+    Pass a :class:`~ai_agent_toolbox.ParserStats` as ``stats`` to have it
+    count chunks, characters, events, tool blocks, buffer high-water marks and
+    parse time. Without it, the only cost is one check per call.
     """
 
-    def __init__(self, tag: str = "tool") -> None:
+    def __init__(
+        self,
+        tag: str = "tool",
+        block_tags: Iterable[str] = (),
+        coalesce: bool = False,
+        coalesce_min_chars: int = 0,
+        coalesce_max_delay: Optional[float] = None,
+        id_factory: Optional[IdFactory] = None,
+        event_types: Optional[Iterable[str]] = None,
+        spill_threshold: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+        lazy_args: bool = False,
+        stats: Optional[ParserStats] = None,
+    ) -> None:
+        if event_types is None:
+            self.event_types: FrozenSet[EventType] = frozenset(EventType)
+        else:
+            try:
+                self.event_types = frozenset(EventType(kind) for kind in event_types)
+            except ValueError as exc:
+                raise ValueError(
+                    f"Unknown event type in {event_types!r}; "
+                    f"expected any of {[kind.value for kind in EventType]}"
+                ) from exc
+
         self._inside_tool: bool = False
         self.events: List[ParserEvent] = []
+        self.id_factory: IdFactory = id_factory or counter_id_factory()
         self.text_stream: TextEventStream = TextEventStream(
-            lambda event: self.events.append(event)
+            lambda event: self.events.append(event),
+            id_factory=self.id_factory,
+            enabled=EventType.TEXT in self.event_types,
         )
         self.outside_buffer: str = ""
-        self.tool_parser = ToolParser(tag=tag)
+        self.tool_parser = ToolParser(
+            tag=tag,
+            id_factory=self.id_factory,
+            emit_events=EventType.TOOL in self.event_types,
+            spill_threshold=spill_threshold,
+            spill_dir=spill_dir,
+            lazy_args=lazy_args,
+            stats=stats,
+        )
+        self.stats = stats
 
         # We define the strings for scanning the outside buffer.
         self.tag = tag
         self.start_tag = f"<{tag}>"
 
+        self.block_tags: Tuple[str, ...] = tuple(dict.fromkeys(block_tags))
+        if tag in self.block_tags:
+            raise ValueError(f"Tag {tag!r} cannot be both the tool tag and a block tag")
+        self.block_stream: TextEventStream = TextEventStream(
+            lambda event: self.events.append(event),
+            event_type=EventType.BLOCK,
+            id_factory=self.id_factory,
+            enabled=EventType.BLOCK in self.event_types,
+        )
+        # Partial close tag held back while inside a block
+        self.block_buffer: str = ""
+        self._block_starts: Dict[str, str] = {f"<{name}>": name for name in self.block_tags}
+
+        # One shared matcher recognizes the tool tag and every block tag;
+        # outside_buffer always holds a partial start tag between chunks.
+        self._matcher = tag_matcher(self.start_tag, *self._block_starts)
+
+        self._coalescer: Optional[EventCoalescer] = None
+        if coalesce or coalesce_min_chars or coalesce_max_delay is not None:
+            self._coalescer = EventCoalescer(
+                min_chars=coalesce_min_chars, max_delay=coalesce_max_delay
+            )
+
+        # Stream offset of the current chunk's first character
+        self._position: int = 0
+
+        # Constructor arguments other than id_factory, for building equivalent
+        # parsers in worker processes
+        self._options: Dict[str, Any] = {
+            "tag": tag,
+            "block_tags": self.block_tags,
+            "coalesce": coalesce,
+            "coalesce_min_chars": coalesce_min_chars,
+            "coalesce_max_delay": coalesce_max_delay,
+            "event_types": tuple(kind.value for kind in self.event_types),
+            "spill_threshold": spill_threshold,
+            "spill_dir": spill_dir,
+            "lazy_args": lazy_args,
+        }
+
     def parse_chunk(self, chunk: str) -> List[ParserEvent]:
+        if self.stats is None:
+            return self._parse_chunk(chunk)
+        started = time.perf_counter()
+        events = self._parse_chunk(chunk)
+        self._record_stats(events, started, chunk)
+        return events
+
+    def _parse_chunk(self, chunk: str) -> List[ParserEvent]:
         self.events = []
         if self._inside_tool:
             self._handle_inside_tool(chunk)
+        elif not self._block_starts:
+            self._handle_outside_tool_only(chunk, 0)
+        elif self.block_stream.is_open:
+            resume = self._handle_inside_block(chunk, 0)
+            if resume is not None:
+                self._handle_outside(chunk, resume)
         else:
             self._handle_outside(chunk)
+        self._position += len(chunk)
+        if self._coalescer is not None:
+            return self._coalescer.coalesce(self.events)
         return self.events
 
-    def _handle_outside(self, chunk: str) -> None:
-        combined = self.outside_buffer + chunk
-        self.outside_buffer = ""
-
-        while True:
-            use_idx = combined.find(self.start_tag)
-            if use_idx == -1:
-                # No <use_tool> found
-                partial_prefix = self._partial_prefix(combined, self.start_tag)
-                if partial_prefix:
-                    # There's a partial match at the end of combined 
-                    text_before_partial = combined[:-len(partial_prefix)]
-                    self._stream_outside_text(text_before_partial)
-                    self.outside_buffer = partial_prefix
-                else:
-                    # No partial match, all is just outside text
-                    self._stream_outside_text(combined)
-                break
+    def _record_stats(self, events: List[ParserEvent], started: float, chunk: str) -> None:
+        """Add one parse_chunk or flush call, begun at ``started``, to the stats."""
+        stats = self.stats
+        stats.parse_seconds += time.perf_counter() - started
+        if chunk:
+            stats.chunks += 1
+            stats.chars += len(chunk)
+        if events:
+            stats._add_events(events)
+        if len(self.outside_buffer) > stats.outside_buffer_high:
+            stats.outside_buffer_high = len(self.outside_buffer)
+        buffered = self.tool_parser.buffered_chars()
+        if buffered > stats.tool_buffer_high:
+            stats.tool_buffer_high = buffered
 
-            # We found <use_tool>. Everything before that is outside text
-            text_before = combined[:use_idx]
-            self._stream_outside_text(text_before)
-            self._close_text_block()
+    def snapshot(self) -> bytes:
+        """Serialize the stream state between calls, e.g. to resume elsewhere.
 
-            # Prepare to feed the rest into the tool parser
-            combined = combined[use_idx + len(self.start_tag):]
-            new_events, done, leftover = self.tool_parser.parse(combined)
-            self.events.extend(new_events)
+        The result is versioned bytes holding the constructor options, the id
+        counter and every buffer (held partial tags, the tool parser's state,
+        undecoded bytes, a held coalesced append). Its size depends on what is
+        buffered, not on how much was parsed. See :meth:`restore`.
+        """
+        state = self._get_state()
+        if state["decoder"] is not None:
+            pending_bytes, decoder_flag = state["decoder"]
+            state["decoder"] = [pending_bytes.hex(), decoder_flag]
+        state["options"] = self._options
+        state["ids"] = self._id_state()
+        payload = json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+        return _SNAPSHOT_MAGIC + bytes([_SNAPSHOT_VERSION]) + payload.encode("utf-8")
 
-            if done:
-                # Tool parser done, reset and remain outside
-                self.tool_parser = ToolParser(tag=self.tag)
-                self._inside_tool = False
-                combined = leftover
+    def _get_state(self) -> Dict[str, Any]:
+        """Return the stream state between calls, except options and ids."""
+        decoder = self._decoder
+        return {
+            "inside_tool": self._inside_tool,
+            "outside_buffer": self.outside_buffer,
+            "text": self.text_stream.get_state(),
+            "block": self.block_stream.get_state(),
+            "block_buffer": self.block_buffer,
+            "position": self._position,
+            "tool": self.tool_parser.get_state(),
+            "coalescer": self._coalescer.get_state() if self._coalescer is not None else None,
+            "decoder": decoder.getstate() if decoder is not None else None,
+        }
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        """Load the output of :meth:`_get_state` into a fresh parser."""
+        self._inside_tool = state["inside_tool"]
+        self.outside_buffer = state["outside_buffer"]
+        self.text_stream.set_state(state["text"])
+        self.block_stream.set_state(state["block"])
+        self.block_buffer = state["block_buffer"]
+        self._position = state["position"]
+        self.tool_parser.set_state(state["tool"])
+        if self._coalescer is not None:
+            self._coalescer.set_state(state["coalescer"])
+        if state["decoder"] is not None:
+            self._decoder = codecs.getincrementaldecoder("utf-8")()
+            self._decoder.setstate(state["decoder"])
+
+    def fork(self, id_factory: Optional[IdFactory] = None) -> "XMLParser":
+        """Return an independent parser in the same stream state.
+
+        Only buffered data is copied, so the cost does not depend on how much
+        was parsed before. Both parsers can then be fed different
+        continuations, e.g. one per sampled branch. By default the fork
+        continues a copy of the id counter, so each branch emits exactly the
+        events an unforked parser would; pass ``id_factory`` for distinct ids
+        in new blocks. Other id factories are shared.
+        """
+        if id_factory is None:
+            id_factory = self.id_factory
+            if isinstance(id_factory, CounterIdFactory):
+                id_factory = CounterIdFactory(id_factory.prefix, id_factory.next_id)
+        clone = type(self)(id_factory=id_factory, stats=self.stats, **self._options)
+        clone._set_state(self._get_state())
+        return clone
+
+    @classmethod
+    def restore(cls, data: bytes, id_factory: Optional[IdFactory] = None) -> "XMLParser":
+        """Return a parser that continues the stream captured by :meth:`snapshot`.
+
+        Feeding it the rest of the stream yields exactly the events the
+        original parser would have. Counter ids (the default) and
+        ``parser_utils.uuid4_id`` are restored; any other id factory must be
+        passed as ``id_factory``.
+        """
+        header = len(_SNAPSHOT_MAGIC) + 1
+        if data[:len(_SNAPSHOT_MAGIC)] != _SNAPSHOT_MAGIC:
+            raise ValueError("Not an XMLParser snapshot")
+        if len(data) < header:
+            raise ValueError("Truncated XMLParser snapshot")
+        if data[header - 1] != _SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported XMLParser snapshot version {data[header - 1]}")
+        try:
+            state = json.loads(data[header:].decode("utf-8"))
+        except ValueError as error:
+            # Includes UnicodeDecodeError, e.g. when cut inside a character
+            raise ValueError("Truncated or corrupt XMLParser snapshot") from error
+
+        ids = state["ids"]
+        if id_factory is None:
+            if ids is None:
+                raise ValueError("Snapshot used a custom id_factory; pass it to restore()")
+            id_factory = uuid4_id if ids == "uuid4" else CounterIdFactory(*ids)
+        if state["decoder"] is not None:
+            pending_bytes, decoder_flag = state["decoder"]
+            state["decoder"] = (bytes.fromhex(pending_bytes), decoder_flag)
+        parser = cls(id_factory=id_factory, **state["options"])
+        parser._set_state(state)
+        return parser
+
+    def _id_state(self) -> Union[List[Any], str, None]:
+        id_factory = self.id_factory
+        if isinstance(id_factory, CounterIdFactory):
+            return [id_factory.prefix, id_factory.next_id]
+        if id_factory is uuid4_id:
+            return "uuid4"
+        return None
+
+    def parse_parallel(
+        self,
+        text: str,
+        workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        segment_chars: Optional[int] = None,
+    ) -> List[ParserEvent]:
+        """Parse a complete document across worker processes.
+
+        Returns the same events as :meth:`parse` on a fresh parser with this
+        parser's options and ``id_factory``; this parser's own stream state is
+        not touched. See :func:`ai_agent_toolbox.batch.parse_parallel`.
+        """
+        from ai_agent_toolbox.batch import parse_parallel
+
+        return parse_parallel(
+            text,
+            workers=workers,
+            executor=executor,
+            segment_chars=segment_chars,
+            id_factory=self.id_factory,
+            **self._options,
+        )
+
+    def _at_tool_start(self) -> bool:
+        """Return whether the last chunk ended right after a tool start tag."""
+        tool = self.tool_parser
+        return (
+            self._inside_tool
+            and tool.state == ToolParserState.WAITING_FOR_NAME
+            and not tool.buffer
+            and tool._awaiting is None
+            and not tool._stalled
+        )
+
+    def _handle_outside(self, chunk: str, start: int = 0) -> None:
+        if not self._block_starts:
+            self._handle_outside_tool_only(chunk, start)
+            return
+        # Next occurrence of each tag in this chunk, shared across scans
+        hits: Dict[str, int] = {}
+        pos: Optional[int] = start
+
+        while pos is not None:
+            end, tag, self.outside_buffer = self._scan_text(
+                chunk, pos, self._matcher, self.outside_buffer, self.text_stream, hits,
+                self._position,
+            )
+            if end == -1:
+                return
+
+            # We found a start tag. Everything before it was outside text
+            self._close_text_block()
+            if tag == self.start_tag:
+                pos = self._enter_tool(chunk, end)
             else:
-                # Partial tool block, switch to inside state
-                self._inside_tool = True
-                self.outside_buffer = leftover
+                self.block_stream.open(
+                    self._block_starts[tag], start=self._position + end - len(tag)
+                )
+                pos = self._handle_inside_block(chunk, end)
+
+    def _handle_outside_tool_only(self, chunk: str, start: int) -> None:
+        """:meth:`_handle_outside` without block tags, the usual case.
+
+        Only the tool start tag can begin here, so it is found with a plain
+        ``str.find`` instead of the multi-tag matcher.
+        """
+        matcher = self._matcher
+        start_tag = self.start_tag
+        stream = self.text_stream
+        origin = self._position
+        pos: Optional[int] = start
+
+        if self.outside_buffer:
+            # Finish the partial start tag carried over from the last chunk
+            end, _, self.outside_buffer = self._scan_text(
+                chunk, start, matcher, self.outside_buffer, stream, {}, origin
+            )
+            if end == -1:
+                return
+            self._close_text_block()
+            pos = self._enter_tool(chunk, end)
+
+        while pos is not None:
+            index = chunk.find(start_tag, pos)
+            if index == -1:
+                # Any partial start tag at the end of chunk is held back; with
+                # no "<" near the end there is none
+                end = len(chunk)
+                tail = end - len(start_tag) + 1
+                if chunk.find("<", pos if pos > tail else tail) == -1:
+                    partial = ""
+                else:
+                    partial = matcher.texts[matcher.suffix_state(chunk, pos)]
+                    end -= len(partial)
+                if end > pos and stream.enabled:
+                    stream.stream(chunk[pos:end], origin + pos)
+                self.outside_buffer = partial
                 return
+            if index > pos and stream.enabled:
+                stream.stream(chunk[pos:index], origin + pos)
+            self._close_text_block()
+            pos = self._enter_tool(chunk, index + len(start_tag))
+
+    @staticmethod
+    def _scan_text(
+        chunk: str,
+        start: int,
+        matcher: TagMatcher,
+        held: str,
+        stream: TextEventStream,
+        hits: Dict[str, int],
+        origin: int,
+    ) -> Tuple[int, str, str]:
+        """Stream ``chunk[start:]`` as text up to the next tag of ``matcher``.
+
+        ``held`` is a partial tag carried over from the previous chunk, which
+        ended right before ``chunk[start]``; ``origin`` is the stream offset of
+        ``chunk[0]``. Returns
+        ``(end, tag, held)``: ``end`` is the index just past the tag found, or
+        -1 if there is none, in which case ``held`` is the partial tag now held
+        back from the end of the chunk.
+        """
+        pos = start
+        # A disabled stream drops text, so skip slicing it out
+        emit = stream.enabled
+        # Held text that turned out not to be a tag; it is emitted together
+        # with the text that follows.
+        lead = ""
+
+        if held:
+            # Finish the partial tag carried over from the last chunk
+            state, pos = matcher.resume(matcher.state_of(held), chunk, start)
+            consumed = pos - start
+            tag = matcher.match(state)
+            if tag is not None:
+                # Completed a tag; its first chars were held back
+                if emit:
+                    stream.stream(held[:len(held) + consumed - len(tag)], origin + start - len(held))
+                return pos, tag, ""
+            partial = matcher.texts[state]
+            if len(partial) > consumed:
+                # Still a partial match that reaches back into held text
+                if emit:
+                    stream.stream(
+                        held[:len(held) + consumed - len(partial)], origin + start - len(held)
+                    )
+                return -1, "", partial
+            # The held text is plain; no match can start before chunk[start]
+            lead = held
+            pos = start
+
+        tag_idx, tag = matcher.find(chunk, pos, hits)
+        if tag_idx == -1:
+            # Any partial match at the end of chunk is held back
+            partial = matcher.texts[matcher.suffix_state(chunk, pos)]
+            if emit:
+                stream.stream(lead + chunk[pos:len(chunk) - len(partial)], origin + pos - len(lead))
+            return -1, "", partial
+
+        if emit:
+            stream.stream(lead + chunk[pos:tag_idx], origin + pos - len(lead))
+        return tag_idx + len(tag), tag, ""
+
+    def _handle_inside_block(self, chunk: str, start: int) -> Optional[int]:
+        """Stream block contents until the block's close tag.
+
+        Returns the index in chunk where outside text resumes, or None if the
+        block is still open.
+        """
+        end_matcher = tag_matcher(f"</{self.block_stream.current_tag}>")
+        end, _, self.block_buffer = self._scan_text(
+            chunk, start, end_matcher, self.block_buffer, self.block_stream, {}, self._position
+        )
+        if end == -1:
+            return None
+        self.block_stream.close(end=self._position + end)
+        return end
+
+    def _enter_tool(self, chunk: str, start: int) -> Optional[int]:
+        """Feed ``chunk[start:]`` to the tool parser.
+
+        Returns the index in chunk where outside text resumes, or None if the
+        tool block is still open.
+        """
+        new_events, done, end = self.tool_parser.feed(chunk, start, self._position)
+        self.events.extend(new_events)
+
+        if done:
+            # Tool parser done, reset and remain outside
+            self.tool_parser.reset()
+            self._inside_tool = False
+            return end
+        # Partial tool block, switch to inside state
+        self._inside_tool = True
+        return None
 
     def _handle_inside_tool(self, chunk: str) -> None:
-        new_events, done, leftover = self.tool_parser.parse(chunk)
+        new_events, done, end = self.tool_parser.feed(chunk, 0, self._position)
         self.events.extend(new_events)
 
         if done:
             # Tool done, revert to outside and process leftover
-            self.tool_parser = ToolParser(tag=self.tag)
+            self.tool_parser.reset()
             self._inside_tool = False
-            self._handle_outside(leftover)
-        else:
-            # Still not done, accumulate leftover for the next chunk
-            self.outside_buffer = leftover
+            self._handle_outside(chunk, end)
 
-    @staticmethod
-    def _partial_prefix(text: str, pattern: str) -> str:
-        """Return suffix of text that is a prefix of pattern."""
-        max_len = min(len(text), len(pattern) - 1)
-        for size in range(max_len, 0, -1):
-            if text.endswith(pattern[:size]):
-                return pattern[:size]
-        return ""
+    def _skippable_bytes(self, chunk: Union[bytes, bytearray]) -> int:
+        # Outside text nobody consumes can be dropped up to the next "<",
+        # which every tag starts with and which never occurs inside a
+        # multibyte UTF-8 sequence.
+        if (
+            self.text_stream.enabled
+            or self._inside_tool
+            or self.block_stream.is_open
+            or self.outside_buffer
+        ):
+            return 0
+        index = chunk.find(b"<")
+        return len(chunk) if index == -1 else index
 
-    def _stream_outside_text(self, text: str) -> None:
-        self.text_stream.stream(text)
+    def _bytes_skipped(self, chunk: Union[bytes, bytearray], count: int) -> None:
+        # Skipped characters still count towards event offsets
+        chars = len(chunk[:count].translate(None, _CONTINUATION_BYTES))
+        self._position += chars
+        if self.stats is not None:
+            self.stats.chars += chars
 
-    def _open_text_block(self) -> None:
-        self.text_stream.open()
+    def _stream_outside_text(self, text: str, start: int) -> None:
+        self.text_stream.stream(text, start)
+
+    def _open_text_block(self, start: int) -> None:
+        self.text_stream.open(start=start)
 
     def _close_text_block(self) -> None:
         self.text_stream.close()
@@ -114,35 +551,60 @@ class XMLParser(Parser):
         Called when no more data is expected.
         Closes any open text block or partial tool parse.
         """
-        flush_events: List[ParserEvent] = []
+        if self.stats is None:
+            return self._flush()
+        started = time.perf_counter()
+        events = self._flush()
+        self._record_stats(events, started, "")
+        return events
+
+    def _flush(self) -> List[ParserEvent]:
+        # Characters still pending from parse_bytes_chunk come first
+        pending = self._finish_bytes()
+        if pending and self.stats is not None:
+            self.stats.chunks += 1
+            self.stats.chars += len(pending)
+        flush_events: List[ParserEvent] = self._parse_chunk(pending) if pending else []
 
         previous_events = self.events
         self.events = flush_events
 
         try:
+            # Close an unterminated block, keeping any partial close tag
+            if self.block_stream.is_open:
+                self.block_stream.stream(
+                    self.block_buffer, self._position - len(self.block_buffer)
+                )
+                self.block_buffer = ""
+                self.block_stream.close(end=self._position)
+
             # Flush leftover outside text
             if not self._inside_tool and self.outside_buffer.strip():
-                self._stream_outside_text(self.outside_buffer)
+                self._stream_outside_text(
+                    self.outside_buffer, self._position - len(self.outside_buffer)
+                )
                 self.outside_buffer = ""
 
             self._close_text_block()
 
             # Handle partial tool parse
             if self._inside_tool:
-                events, done, leftover = self.tool_parser.parse("")
+                events, done, leftover = self.tool_parser.parse("", self._position)
                 flush_events.extend(events)
                 if not done:
                     if not self.tool_parser.current_tool_id:
-                        self._open_text_block()
+                        self._open_text_block(self.tool_parser._block_start)
                     else:
                         self._finalize_tool_parser(flush_events)
-                self.tool_parser = ToolParser(tag=self.tag)
+                self.tool_parser.reset()
                 self._inside_tool = False
 
                 if leftover.strip():
                     self._handle_outside(leftover)
                     self._close_text_block()
 
+            if self._coalescer is not None:
+                return self._coalescer.coalesce(flush_events, final=True)
             return flush_events
         finally:
             self.events = previous_events
@@ -151,21 +613,27 @@ class XMLParser(Parser):
         # Force-close partial tool usage if it's not fully done
         if self.tool_parser and not self.tool_parser.is_done():
             # Manually finalize
-            if self.tool_parser.current_tool_id:
+            if self.tool_parser.current_tool_id and self.tool_parser.stats is not None:
+                self.tool_parser.stats.tool_blocks += 1
+            if self.tool_parser.current_tool_id and self.tool_parser.emit_events:
                 # If there's an open arg, close it
                 if self.tool_parser.current_arg_name is not None:
                     self.tool_parser._close_tool_arg()
                 # Emit the final close
                 flush_events.append(
                     ParserEvent(
-                        type="tool",
+                        type=EventType.TOOL,
                         is_tool_call=True,
-                        mode="close",
+                        mode=EventMode.CLOSE,
                         id=self.tool_parser.current_tool_id,
                         tool=ToolUse(
                             name=self.tool_parser.current_tool_name or "",
-                            args=self.tool_parser.current_tool_args.copy()
+                            args=self.tool_parser.current_tool_args.copy(),
+                            offsets=self.tool_parser._arg_offsets.copy(),
                         ),
+                        start=self.tool_parser._block_start,
+                        end=self._position,
                     )
                 )
+                self.tool_parser._release_spills()
             self.tool_parser.state = ToolParserState.DONE
@@ -8,14 +8,24 @@ Measures metrics that matter for real-world streaming use cases like RL:
 4. Streaming capability: Can the parser handle incomplete chunks?
 """
 
+import argparse
+import atexit
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import time
 import re
 import tracemalloc
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
-from ai_agent_toolbox import XMLParser
+from ai_agent_toolbox import EventMode, EventType, ParserEvent, ToolUse, XMLParser, parse_many
+from ai_agent_toolbox.parser_utils import counter_id_factory, uuid4_id
+from ai_agent_toolbox.tool_parser import ToolParser
 
 # ------------------------------------------------------------------
 # Configuration
@@ -35,6 +45,67 @@ LARGE_PAYLOAD = COMPLETE_TOOL_XML * 100
 # Scaling test payloads (increasing sizes to show O(n²) vs O(n) behavior)
 SCALING_SIZES = [1, 10, 50, 100, 200]
 
+# Tool blocks per RL sample x samples, for per-tool-call allocation churn
+TOOL_CALLS = 20_000
+SHORT_TOOL_BODY = "<name>calculate</name><expression>2 + 2</expression></use_tool>"
+
+# Text and tool blocks for the id generation benchmark
+ID_BLOCKS = 20_000
+
+# Event histories kept by long-lived sessions
+EVENT_COUNT = 1_000_000
+
+# Text-heavy transcripts: mostly prose with an occasional tool call
+TRANSCRIPT_TURNS = 2_000
+TRANSCRIPT_PROSE = "The model reasons at length before acting; most of it is plain text. " * 20
+
+# Tree search: one generated prefix continued by many sampled branches
+FORK_BRANCHES = 64
+FORK_PREFIX_TURNS = 100
+
+# Completed RL responses scored per step by parse_many
+BATCH_DOCUMENTS = 20_000
+
+# Large single-argument payloads (file writes, patches) streamed token by token
+ARGUMENT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+TOKEN_CHUNK_SIZE = 4  # Roughly one model token per chunk
+ARGUMENT_BODIES = {
+    "prose": "The quick brown fox jumps over the lazy dog. ",
+    # Comparisons leave a '<' without a matching '>' for long stretches
+    "code": "    if lo < hi:\n        lo = lo + step\n",
+}
+
+# Token-sized streaming of a chat transcript, compared with --baseline
+STREAM_TURNS = 300
+STREAM_CHUNK_SIZES = [1, 4, 20]
+STREAM_TAGS = ["use_tool", "a_rather_long_custom_tool_tag"]
+STREAM_ROUNDS = 15  # More than ROUNDS: the differences to catch are small
+
+# Timed repetitions of which the fastest counts
+ROUNDS = 5
+
+# Repository checkout holding the package, for --baseline
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "ai_agent_toolbox"
+
+# Smaller inputs for --quick (CI smoke runs): every benchmark still runs,
+# in seconds rather than minutes, but the figures are only indicative
+QUICK_CONFIGURATION = {
+    "NUM_ITERATIONS": 10,
+    "SCALING_SIZES": [1, 10, 50],
+    "TOOL_CALLS": 2_000,
+    "ID_BLOCKS": 2_000,
+    "EVENT_COUNT": 100_000,
+    "TRANSCRIPT_TURNS": 200,
+    "FORK_BRANCHES": 8,
+    "FORK_PREFIX_TURNS": 20,
+    "BATCH_DOCUMENTS": 2_000,
+    "ARGUMENT_SIZES": [1_000, 10_000, 100_000],
+    "STREAM_TURNS": 30,
+    "STREAM_ROUNDS": 3,
+    "ROUNDS": 2,
+}
+
 
 @dataclass
 class BenchmarkResult:
@@ -55,6 +126,16 @@ def stream_chunks(text: str, chunk_size: int = CHUNK_SIZE):
         yield text[i:i + chunk_size]
 
 
+def best_seconds(fn) -> float:
+    """Return the fastest of ROUNDS timed calls of ``fn``, in seconds."""
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
 # ------------------------------------------------------------------
 # AI Agent Toolbox Parser
 # ------------------------------------------------------------------
@@ -354,6 +435,541 @@ def benchmark_scaling() -> dict:
     return results
 
 
+# ------------------------------------------------------------------
+# Token-sized streaming, against a baseline revision
+# ------------------------------------------------------------------
+def import_package_at(ref: str):
+    """Import the package as of git ``ref`` and return it as a module.
+
+    Its files are copied from git into a temporary directory and imported in
+    place of the current package, which is then put back. Classes taken from
+    the returned module keep working alongside the current ones.
+    """
+
+    def git(*args: str) -> bytes:
+        return subprocess.run(
+            ["git", *args], cwd=REPO_ROOT, check=True, stdout=subprocess.PIPE
+        ).stdout
+
+    root = tempfile.mkdtemp(prefix="baseline-")
+    atexit.register(shutil.rmtree, root, True)
+    for name in git("ls-tree", "-r", "--name-only", ref, PACKAGE).decode().split("\n"):
+        if not name:
+            continue
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as handle:
+            handle.write(git("show", f"{ref}:{name}"))
+
+    def package_modules() -> dict:
+        return {
+            name: module
+            for name, module in sys.modules.items()
+            if name == PACKAGE or name.startswith(PACKAGE + ".")
+        }
+
+    current = package_modules()
+    for name in current:
+        del sys.modules[name]
+    sys.path.insert(0, root)
+    try:
+        return importlib.import_module(PACKAGE)
+    finally:
+        sys.path.remove(root)
+        for name in package_modules():
+            del sys.modules[name]
+        sys.modules.update(current)
+
+
+def stream_transcript(tag: str) -> str:
+    """Return a STREAM_TURNS-turn transcript with one short tool call per turn."""
+
+    return "".join(
+        f"Let me look that up for turn {i}; the answer needs a tool call.\n"
+        f"<{tag}><name>search</name><query>item {i} price</query><limit>{i % 7}</limit></{tag}>\n"
+        "The result came back, so here is a summary of what it found.\n"
+        for i in range(STREAM_TURNS)
+    )
+
+
+def benchmark_token_streaming(baseline=None) -> dict:
+    """Time streaming a transcript at each of STREAM_CHUNK_SIZES.
+
+    ``baseline`` is a module from :func:`import_package_at`. Its XMLParser is
+    timed in the same rounds as the current one, alternating, so machine
+    noise affects both alike.
+    """
+
+    parsers = {"current": XMLParser}
+    if baseline is not None:
+        parsers["baseline"] = baseline.XMLParser
+
+    results = {}
+    for tag in STREAM_TAGS:
+        transcript = stream_transcript(tag)
+        for size in STREAM_CHUNK_SIZES:
+            chunks = list(stream_chunks(transcript, size))
+            best = {name: float("inf") for name in parsers}
+            for _ in range(STREAM_ROUNDS):
+                for name, parser_class in parsers.items():
+                    start = time.perf_counter()
+                    parser = parser_class(tag=tag)
+                    for chunk in chunks:
+                        parser.parse_chunk(chunk)
+                    parser.flush()
+                    best[name] = min(best[name], time.perf_counter() - start)
+            results[tag, size] = {name: seconds * 1000 for name, seconds in best.items()}
+    return results
+
+
+def print_token_streaming_results(streaming: dict, baseline_ref: Optional[str]) -> None:
+    """Print streaming times per tag and chunk size, with the baseline if timed."""
+
+    print("\n" + "=" * 90)
+    print(f"TOKEN-SIZED STREAMING ({STREAM_TURNS} turns, best of {STREAM_ROUNDS})")
+    print("=" * 90)
+    header = f"\n{'Tag':<32} {'Chunk chars':<12} {'Current (ms)':<14}"
+    if baseline_ref is not None:
+        header += f" {baseline_ref[:12] + ' (ms)':<20} {'Change':<10}"
+    print(header)
+    print("-" * 90)
+    for (tag, size), timings in streaming.items():
+        line = f"{tag:<32} {size:<12} {timings['current']:<14.1f}"
+        if baseline_ref is not None:
+            change = timings["current"] / timings["baseline"] - 1
+            line += f" {timings['baseline']:<20.1f} {change:<+10.1%}"
+        print(line)
+    print("-" * 90)
+    if baseline_ref is None:
+        print("\nPass --baseline REF to compare with another revision")
+
+    print("\n" + "=" * 90)
+
+
+# ------------------------------------------------------------------
+# Large Argument Scaling (per-byte cost of huge tool arguments)
+# ------------------------------------------------------------------
+def build_argument_payload(body: str, size: int) -> str:
+    """Wrap ``size`` characters of ``body`` in a single <content> argument."""
+
+    content = (body * (size // len(body) + 1))[:size]
+    return f"<use_tool><name>write_file</name><content>{content}</content></use_tool>"
+
+
+def benchmark_large_argument_scaling() -> dict:
+    """Benchmark per-byte parse cost as a single argument grows to 10 MB."""
+
+    results = {"sizes": list(ARGUMENT_SIZES)}
+
+    for kind, body in ARGUMENT_BODIES.items():
+        per_byte = []
+        for size in ARGUMENT_SIZES:
+            payload = build_argument_payload(body, size)
+            chunks = list(stream_chunks(payload, TOKEN_CHUNK_SIZE))
+
+            parser = XMLParser(tag="use_tool")
+            start = time.perf_counter()
+            for chunk in chunks:
+                parser.parse_chunk(chunk)
+            parser.flush()
+            elapsed = time.perf_counter() - start
+            per_byte.append(elapsed * 1e9 / len(payload))
+        results[kind] = per_byte
+
+    return results
+
+
+def print_large_argument_results(scaling: dict) -> None:
+    """Print per-byte cost for large argument payloads."""
+
+    kinds = list(ARGUMENT_BODIES)
+
+    print("\n" + "=" * 90)
+    print(f"LARGE ARGUMENT SCALING ({TOKEN_CHUNK_SIZE}-char chunks, ns per byte should stay flat)")
+    print("=" * 90)
+    header = f"\n{'Argument size':<16}" + "".join(f"{kind + ' (ns/B)':<18}" for kind in kinds)
+    print(header)
+    print("-" * 55)
+
+    for i, size in enumerate(scaling["sizes"]):
+        row = f"{size:<16,}" + "".join(f"{scaling[kind][i]:<18.1f}" for kind in kinds)
+        print(row)
+
+    print("-" * 55)
+
+    size_growth = scaling["sizes"][-1] / scaling["sizes"][0]
+    print(f"\nGrowth in per-byte cost from {scaling['sizes'][0]:,} to {scaling['sizes'][-1]:,} chars ({size_growth:,.0f}x payload):")
+    for kind in kinds:
+        growth = scaling[kind][-1] / scaling[kind][0]
+        print(f"  {kind:<8} {growth:.2f}x (1.0x = linear)")
+
+    print("\n" + "=" * 90)
+
+
+# ------------------------------------------------------------------
+# Tool Parser Reuse (allocation churn per tool call)
+# ------------------------------------------------------------------
+def benchmark_tool_parser_reuse() -> dict:
+    """Compare a fresh ToolParser per tool block against reset() and reuse."""
+
+    def allocated_per_call(fn, calls: int = 1_000) -> float:
+        # Peak bytes traced while running fn, including memory it frees again
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        fn(calls)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return (peak - before) / calls
+
+    def construct(calls: int) -> list:
+        return [ToolParser(tag="use_tool") for _ in range(calls)]
+
+    used = construct(1_000)
+    for parser in used:
+        parser.feed(SHORT_TOOL_BODY)
+
+    def reset_used(calls: int) -> None:
+        for parser in used[:calls]:
+            parser.reset()
+
+    def realloc() -> None:
+        for _ in range(TOOL_CALLS):
+            ToolParser(tag="use_tool").feed(SHORT_TOOL_BODY)
+
+    def reuse() -> None:
+        parser = ToolParser(tag="use_tool")
+        for _ in range(TOOL_CALLS):
+            parser.reset()
+            parser.feed(SHORT_TOOL_BODY)
+
+    def setup_only(reset: bool) -> None:
+        parser = ToolParser(tag="use_tool")
+        for _ in range(TOOL_CALLS):
+            if reset:
+                parser.reset()
+            else:
+                ToolParser(tag="use_tool")
+
+    # Alternate the two strategies so machine noise hits both alike
+    timings = {"realloc": [], "reuse": [], "construct": [], "reset": []}
+    runs = {
+        "realloc": realloc,
+        "reuse": reuse,
+        "construct": lambda: setup_only(False),
+        "reset": lambda: setup_only(True),
+    }
+    for _ in range(ROUNDS):
+        for name, fn in runs.items():
+            start = time.perf_counter()
+            fn()
+            timings[name].append(time.perf_counter() - start)
+
+    def ns_per_call(name: str) -> float:
+        return min(timings[name]) * 1e9 / TOOL_CALLS
+
+    return {
+        "construct_bytes": allocated_per_call(construct),
+        "reset_bytes": allocated_per_call(reset_used),
+        "construct_ns": ns_per_call("construct"),
+        "reset_ns": ns_per_call("reset"),
+        "realloc_ns": ns_per_call("realloc"),
+        "reuse_ns": ns_per_call("reuse"),
+    }
+
+
+def print_tool_parser_reuse_results(reuse: dict) -> None:
+    """Print allocation and time per tool call for ToolParser reuse."""
+
+    print("\n" + "=" * 90)
+    print(f"TOOL PARSER REUSE ({TOOL_CALLS:,} tool blocks)")
+    print("=" * 90)
+    print(f"\n{'Strategy':<28} {'Setup alloc (B)':<18} {'Setup (ns)':<14} {'Setup + block (ns)':<18}")
+    print("-" * 80)
+    for name, prefix, total in (
+        ("ToolParser() per block", "construct", "realloc_ns"),
+        ("reset() and reuse", "reset", "reuse_ns"),
+    ):
+        print(
+            f"{name:<28} {reuse[prefix + '_bytes']:<18.0f} "
+            f"{reuse[prefix + '_ns']:<14.0f} {reuse[total]:<18.0f}"
+        )
+    print("-" * 80)
+    saved = reuse["realloc_ns"] - reuse["reuse_ns"]
+    print(
+        f"\nreset() allocates {reuse['construct_bytes'] - reuse['reset_bytes']:.0f} fewer bytes "
+        f"and is {reuse['construct_ns'] / reuse['reset_ns']:.1f}x faster than ToolParser(); "
+        f"per block that is {saved:.0f} ns of {reuse['realloc_ns']:.0f} ns"
+    )
+    print("Each closed tool still gets a new args dict, since ToolUse keeps it")
+
+    print("\n" + "=" * 90)
+
+
+# ------------------------------------------------------------------
+# Event Memory (bytes per retained ParserEvent)
+# ------------------------------------------------------------------
+@dataclass
+class DictParserEvent:
+    """ParserEvent as it was before slots: a plain dataclass with __dict__."""
+
+    type: str
+    mode: str
+    id: str
+    tool: Optional[ToolUse] = None
+    is_tool_call: bool = False
+    content: Optional[str] = None
+    tag: Optional[str] = None
+    start: Optional[int] = field(default=None, compare=False)
+    end: Optional[int] = field(default=None, compare=False)
+
+
+def measure_event_bytes(make_event) -> float:
+    """Return traced bytes per event for EVENT_COUNT retained events."""
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    events = [make_event() for _ in range(EVENT_COUNT)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return (after - before) / EVENT_COUNT
+
+
+def benchmark_event_memory() -> dict:
+    """Compare memory of dict-backed and slotted events (content is shared)."""
+
+    content = "token"
+    return {
+        "dict": measure_event_bytes(
+            lambda: DictParserEvent(type="text", mode="append", id="t", content=content)
+        ),
+        "slots": measure_event_bytes(
+            lambda: ParserEvent(
+                type=EventType.TEXT, mode=EventMode.APPEND, id="t", content=content
+            )
+        ),
+    }
+
+
+def print_event_memory_results(memory: dict) -> None:
+    """Print bytes per retained event."""
+
+    print("\n" + "=" * 90)
+    print(f"EVENT MEMORY ({EVENT_COUNT:,} retained append events)")
+    print("=" * 90)
+    print(f"\n{'Representation':<32} {'Bytes/event':<14}")
+    print("-" * 50)
+    print(f"{'dataclass with __dict__':<32} {memory['dict']:<14.1f}")
+    print(f"{'slotted ParserEvent':<32} {memory['slots']:<14.1f}")
+    print("-" * 50)
+    print(f"\nSlotted events use {memory['dict'] / memory['slots']:.1f}x less memory")
+
+    print("\n" + "=" * 90)
+
+
+# ------------------------------------------------------------------
+# Event IDs (uuid4 vs per-parser counter)
+# ------------------------------------------------------------------
+def benchmark_event_ids() -> dict:
+    """Compare per-block cost of uuid4 ids and the default counter ids."""
+
+    # Each tool block also opens a text block for the text before it
+    payload = ("Thinking... " + COMPLETE_TOOL_XML) * (ID_BLOCKS // 2)
+
+    def generate(factory) -> None:
+        for _ in range(ID_BLOCKS):
+            factory()
+
+    results = {}
+    for name, make_factory in (("uuid4", lambda: uuid4_id), ("counter", counter_id_factory)):
+        results[name] = {
+            "id_ns": best_seconds(lambda: generate(make_factory())) * 1e9 / ID_BLOCKS,
+            "parse_ns": best_seconds(
+                lambda: XMLParser(tag="use_tool", id_factory=make_factory()).parse(payload)
+            ) * 1e9 / ID_BLOCKS,
+        }
+    return results
+
+
+def print_event_id_results(ids: dict) -> None:
+    """Print per-block id generation and parse cost."""
+
+    print("\n" + "=" * 90)
+    print(f"EVENT IDS ({ID_BLOCKS:,} text and tool blocks)")
+    print("=" * 90)
+    print(f"\n{'ID factory':<16} {'ns/id':<12} {'Parse ns/block':<16}")
+    print("-" * 50)
+    for name, result in ids.items():
+        print(f"{name:<16} {result['id_ns']:<12.0f} {result['parse_ns']:<16.0f}")
+    print("-" * 50)
+    saving = ids["uuid4"]["parse_ns"] - ids["counter"]["parse_ns"]
+    print(f"\nCounter ids save {saving:.0f} ns per block")
+
+    print("\n" + "=" * 90)
+
+
+# ------------------------------------------------------------------
+# Tools-only parsing (event_types filter)
+# ------------------------------------------------------------------
+def benchmark_tools_only() -> dict:
+    """Compare full and tools-only throughput on a text-heavy transcript."""
+
+    transcript = (TRANSCRIPT_PROSE + COMPLETE_TOOL_XML) * TRANSCRIPT_TURNS
+    chunks = list(stream_chunks(transcript))
+    megabytes = len(transcript) / 1e6
+
+    def streamed(event_types) -> None:
+        parser = XMLParser(tag="use_tool", event_types=event_types)
+        for chunk in chunks:
+            parser.parse_chunk(chunk)
+        parser.flush()
+
+    results = {"megabytes": megabytes, "modes": {}}
+    for name, event_types in (("all events", None), ("tools only", {"tool"})):
+        events = XMLParser(tag="use_tool", event_types=event_types).parse(transcript)
+        results["modes"][name] = {
+            "events": len(events),
+            "batch_mb_s": megabytes / best_seconds(
+                lambda: XMLParser(tag="use_tool", event_types=event_types).parse(transcript)
+            ),
+            "stream_mb_s": megabytes / best_seconds(lambda: streamed(event_types)),
+        }
+    return results
+
+
+def print_tools_only_results(tools_only: dict) -> None:
+    """Print full vs tools-only throughput."""
+
+    print("\n" + "=" * 90)
+    print(
+        f"TOOLS-ONLY PARSING ({tools_only['megabytes']:.1f} MB transcript, "
+        f"{TRANSCRIPT_TURNS:,} tool calls, {CHUNK_SIZE}-char chunks)"
+    )
+    print("=" * 90)
+    print(f"\n{'Mode':<16} {'Events':<12} {'Batch MB/s':<14} {'Streaming MB/s':<16}")
+    print("-" * 60)
+    for name, result in tools_only["modes"].items():
+        print(
+            f"{name:<16} {result['events']:<12,} "
+            f"{result['batch_mb_s']:<14.1f} {result['stream_mb_s']:<16.1f}"
+        )
+    print("-" * 60)
+    full = tools_only["modes"]["all events"]
+    tools = tools_only["modes"]["tools only"]
+    print(
+        f"\nTools-only is {tools['stream_mb_s'] / full['stream_mb_s']:.1f}x faster streaming, "
+        f"{tools['batch_mb_s'] / full['batch_mb_s']:.1f}x in batch"
+    )
+
+    print("\n" + "=" * 90)
+
+
+# ------------------------------------------------------------------
+# Branching (fork vs reparsing the shared prefix)
+# ------------------------------------------------------------------
+def benchmark_fork() -> dict:
+    """Fan one streamed prefix out to FORK_BRANCHES continuations."""
+
+    # The prefix ends inside an open tool argument, so state is buffered
+    prefix = (TRANSCRIPT_PROSE + COMPLETE_TOOL_XML) * FORK_PREFIX_TURNS
+    prefix += "<use_tool><name>write</name><content>draft so far "
+    prefix_chunks = list(stream_chunks(prefix))
+    branches = [f"branch {i}</content></use_tool> done" for i in range(FORK_BRANCHES)]
+
+    def streamed_prefix() -> XMLParser:
+        parser = XMLParser(tag="use_tool")
+        for chunk in prefix_chunks:
+            parser.parse_chunk(chunk)
+        return parser
+
+    def reparse() -> None:
+        for branch in branches:
+            parser = streamed_prefix()
+            parser.parse_chunk(branch)
+            parser.flush()
+
+    shared = streamed_prefix()
+
+    def fork() -> None:
+        for branch in branches:
+            parser = shared.fork()
+            parser.parse_chunk(branch)
+            parser.flush()
+
+    return {
+        "prefix_kb": len(prefix) / 1024,
+        "reparse_ms": best_seconds(reparse) * 1000,
+        "fork_ms": best_seconds(fork) * 1000,
+    }
+
+
+def print_fork_results(fork: dict) -> None:
+    """Print the cost of branching by reparsing vs forking."""
+
+    print("\n" + "=" * 90)
+    print(f"BRANCHING ({FORK_BRANCHES} branches from a {fork['prefix_kb']:.0f} KB streamed prefix)")
+    print("=" * 90)
+    print(f"\n{'Strategy':<24} {'Total (ms)':<14} {'Per branch (us)':<16}")
+    print("-" * 56)
+    for name, key in (("Reparse prefix", "reparse_ms"), ("fork()", "fork_ms")):
+        total = fork[key]
+        print(f"{name:<24} {total:<14.2f} {total * 1000 / FORK_BRANCHES:<16.1f}")
+    print("-" * 56)
+    print(f"\nfork() is {fork['reparse_ms'] / fork['fork_ms']:.0f}x faster")
+
+    print("\n" + "=" * 90)
+
+
+# ------------------------------------------------------------------
+# Batch parsing across processes (parse_many)
+# ------------------------------------------------------------------
+def benchmark_parse_many() -> dict:
+    """Time parse_many over a batch of responses for growing worker counts."""
+
+    documents = [
+        f"Step {i}: let me compute this. " * 5 + COMPLETE_TOOL_XML + " The answer follows."
+        for i in range(BATCH_DOCUMENTS)
+    ]
+    cpus = os.cpu_count() or 1
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= cpus:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != cpus:
+        worker_counts.append(cpus)
+
+    results = {"cpus": cpus, "workers": worker_counts}
+    for output in ("events", "tool_uses"):
+        timings = []
+        for workers in worker_counts:
+            start = time.perf_counter()
+            parse_many(documents, workers=workers, output=output, tag="use_tool")
+            timings.append(time.perf_counter() - start)
+        results[output] = timings
+    return results
+
+
+def print_parse_many_results(batch: dict) -> None:
+    """Print parse_many throughput by worker count."""
+
+    print("\n" + "=" * 90)
+    print(f"BATCH PARSING ({BATCH_DOCUMENTS:,} documents, {batch['cpus']} CPUs)")
+    print("=" * 90)
+    print(f"\n{'Workers':<10} {'Events docs/s':<16} {'Speedup':<10} {'Tool uses docs/s':<18} {'Speedup':<10}")
+    print("-" * 66)
+    for i, workers in enumerate(batch["workers"]):
+        events = batch["events"][i]
+        tools = batch["tool_uses"][i]
+        events_speedup = f"{batch['events'][0] / events:.1f}x"
+        tools_speedup = f"{batch['tool_uses'][0] / tools:.1f}x"
+        print(
+            f"{workers:<10} {BATCH_DOCUMENTS / events:<16,.0f} {events_speedup:<10} "
+            f"{BATCH_DOCUMENTS / tools:<18,.0f} {tools_speedup:<10}"
+        )
+    print("-" * 66)
+
+    print("\n" + "=" * 90)
+
+
 # ------------------------------------------------------------------
 # Main
 # ------------------------------------------------------------------
@@ -433,6 +1049,20 @@ def print_scaling_results(scaling: dict) -> None:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Benchmark AI Agent Toolbox parsing.")
+    parser.add_argument(
+        "--quick", action="store_true", help="small inputs and few rounds, for CI smoke runs"
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="REF",
+        help="also time token-sized streaming with the package at this git ref",
+    )
+    args = parser.parse_args()
+    if args.quick:
+        globals().update(QUICK_CONFIGURATION)
+    baseline = import_package_at(args.baseline) if args.baseline else None
+
     results = [
         benchmark_toolbox(),
         benchmark_naive_regex_batch(),
@@ -447,6 +1077,22 @@ def main():
     scaling = benchmark_scaling()
     print_scaling_results(scaling)
 
+    print_token_streaming_results(benchmark_token_streaming(baseline), args.baseline)
+
+    print_tool_parser_reuse_results(benchmark_tool_parser_reuse())
+
+    print_event_memory_results(benchmark_event_memory())
+
+    print_event_id_results(benchmark_event_ids())
+
+    print_tools_only_results(benchmark_tools_only())
+
+    print_parse_many_results(benchmark_parse_many())
+
+    print_fork_results(benchmark_fork())
+
+    print_large_argument_results(benchmark_large_argument_scaling())
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+"""
+Benchmarks for Toolbox call overhead.
+
+Measures how many tool calls per second ``Toolbox.use`` dispatches for each
+argument schema type. The tool itself does nothing, so the figures are the
+cost of looking the tool up and converting and validating its arguments.
+"""
+
+import json
+import time
+
+from ai_agent_toolbox import ParserEvent, Toolbox, ToolUse
+
+# ------------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------------
+CALLS = 50_000
+ROUNDS = 5
+
+# Schema type -> (argument schema, raw argument value as the parser emits it)
+SCHEMAS = {
+    "int": ({"type": "int", "min": 0, "max": 1000}, "42"),
+    "float": ({"type": "float", "min": 0.0}, "3.25"),
+    "bool": ({"type": "bool"}, "yes"),
+    "enum": (
+        {"type": "enum", "choices": ["low", "medium", "high", "urgent", "later"]},
+        "urgent",
+    ),
+    "list": ({"type": "list"}, json.dumps([1, 2, 3, {"a": "b"}])),
+    "dict": ({"type": "dict"}, json.dumps({"owner": "core", "tags": ["x", "y"]})),
+}
+
+
+def noop(**kwargs):
+    return None
+
+
+def benchmark_schema(schema: dict, raw: str) -> float:
+    """Return calls per second of ``Toolbox.use`` for one argument of ``schema``."""
+
+    toolbox = Toolbox()
+    toolbox.add_tool("tool", noop, {"value": schema})
+    event = ParserEvent(
+        type="tool",
+        mode="close",
+        id="bench",
+        tool=ToolUse(name="tool", args={"value": raw}),
+        is_tool_call=True,
+    )
+    use = toolbox.use
+
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            use(event)
+        best = min(best, time.perf_counter() - start)
+    return CALLS / best
+
+
+def main():
+    print("\n" + "=" * 60)
+    print(f"TOOLBOX CALL THROUGHPUT ({CALLS:,} calls, best of {ROUNDS})")
+    print("=" * 60)
+    print(f"\n{'Schema':<10} {'Calls/s':<14} {'us/call':<10}")
+    print("-" * 36)
+    for name, (schema, raw) in SCHEMAS.items():
+        rate = benchmark_schema(schema, raw)
+        print(f"{name:<10} {rate:<14,.0f} {1e6 / rate:<10.2f}")
+    print("-" * 36)
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,13 +28,9 @@ async def main():
     prompt = "Yeet about something interesting."
     system += formatter.usage_prompt(toolbox)
 
-    async for chunk in anthropic_stream(system, prompt):
-        for event in parser.parse_chunk(chunk):
-            await toolbox.use_async(event)
-
-    # Process any remaining events after stream ends
-    for event in parser.flush():
-        toolbox.use(event)
+    # aparse flushes the parser once the stream ends
+    async for event in parser.aparse(anthropic_stream(system, prompt)):
+        await toolbox.use_async(event)
 
 if __name__ == "__main__":
     asyncio.run(main())
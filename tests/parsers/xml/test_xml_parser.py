@@ -1,5 +1,9 @@
+import os
+import pickle
+
 import pytest
-from ai_agent_toolbox import XMLParser
+from ai_agent_toolbox import ArgSpan, ParserStats, SpilledArg, XMLParser
+from ai_agent_toolbox.parser_utils import TAG_MATCHER_CACHE_SIZE, tag_matcher
 
 @pytest.fixture
 def parser():
@@ -283,3 +287,592 @@ def test_invalid_tool_argument(parser):
         assert "<invalid>" not in event.content
         content += event.content
     assert "regular text" in content
+
+def test_streaming_large_argument_matches_batch(parser):
+    """Token-sized chunks of a huge argument yield the same tool as one-shot parsing."""
+    body = "The quick brown fox jumps over the lazy dog.\n" * 5000
+    xml = f"<use_tool><name>write_file</name><content>{body}</content></use_tool> done"
+
+    streamed = []
+    for i in range(0, len(xml), 4):
+        streamed.extend(parser.parse_chunk(xml[i:i + 4]))
+    streamed.extend(parser.flush())
+
+    batch = XMLParser(tag="use_tool").parse(xml)
+    streamed_tools = [e.tool for e in streamed if e.is_tool_call]
+    assert streamed_tools == [e.tool for e in batch if e.is_tool_call]
+    assert streamed_tools[0].args == {"content": body}
+
+
+def test_streaming_unmatched_angle_bracket_is_not_rebuffered(parser):
+    """Input after a '<' with no '>' is held back instead of regrown per chunk."""
+    parser.parse_chunk("<use_tool><name>write_file</name><content>if lo ")
+    parser.parse_chunk("< hi:")
+    for _ in range(1000):
+        assert parser.parse_chunk(" lo = lo + step") == []
+    assert len(parser.tool_parser.buffer) < 20
+
+    events = parser.parse_chunk("</content></use_tool>") + parser.flush()
+    tool_events = [e for e in events if e.is_tool_call]
+    assert len(tool_events) == 1
+    assert tool_events[0].tool.name == "write_file"
+
+def test_streaming_near_miss_start_tag(parser):
+    """Held-back partial start tags that never complete are emitted as text."""
+    chunks = ["a <use", "_to", "x <use_to", "ol><name>t</name></use_tool>"]
+
+    all_events = []
+    for chunk in chunks:
+        all_events.extend(parser.parse_chunk(chunk))
+    all_events.extend(parser.flush())
+
+    text = "".join(e.content for e in all_events if e.type == "text" and e.mode == "append")
+    assert text == "a <use_tox "
+    tool_events = [e for e in all_events if e.is_tool_call]
+    assert len(tool_events) == 1
+    assert tool_events[0].tool.name == "t"
+
+
+def test_streaming_self_overlapping_tag():
+    """Tags whose prefix repeats inside them are matched across chunk boundaries."""
+    parser = XMLParser(tag="t<t")
+    chunks = list("x <t<t<t<t><name>n</name></t<t> y")
+
+    all_events = []
+    for chunk in chunks:
+        all_events.extend(parser.parse_chunk(chunk))
+    all_events.extend(parser.flush())
+
+    text = "".join(e.content for e in all_events if e.type == "text" and e.mode == "append")
+    assert text == "x <t<t y"
+    tool_events = [e for e in all_events if e.is_tool_call]
+    assert [e.tool.name for e in tool_events] == ["n"]
+
+def test_tag_matchers_are_shared_and_bounded():
+    """Parsers for the same tags share a matcher; distinct tag sets do not pile up."""
+    assert XMLParser(tag="shared")._matcher is XMLParser(tag="shared")._matcher
+    for i in range(TAG_MATCHER_CACHE_SIZE + 10):
+        XMLParser(tag=f"tool{i}").parse("<tool0><name>n</name></tool0>")
+    assert tag_matcher.cache_info().currsize <= TAG_MATCHER_CACHE_SIZE
+
+def test_block_tags_routed_in_one_pass():
+    """Block tags stream as block events while tool tags still go to the tool parser."""
+    parser = XMLParser(tag="tool", block_tags=("think", "answer"))
+    text = (
+        "<think>plan a < b</think>"
+        "<tool><name>search</name><query>news</query></tool>"
+        "<answer>done</answer> bye"
+    )
+    events = parser.parse(text)
+
+    assert [(e.type, e.mode, e.tag) for e in events] == [
+        ("block", "create", "think"),
+        ("block", "append", "think"),
+        ("block", "close", "think"),
+        ("tool", "create", None),
+        ("tool", "append", None),
+        ("tool", "close", None),
+        ("block", "create", "answer"),
+        ("block", "append", "answer"),
+        ("block", "close", "answer"),
+        ("text", "create", None),
+        ("text", "append", None),
+        ("text", "close", None),
+    ]
+    assert events[1].content == "plan a < b"
+    assert events[5].tool.args == {"query": "news"}
+    assert events[7].content == "done"
+    assert events[0].id == events[2].id != events[6].id
+
+
+def test_block_tags_streamed_across_chunks():
+    """Start and close tags of blocks may be split at any chunk boundary."""
+    text = "hi <think>a <tool> is literal here</think><answer>42</answer>"
+    parser = XMLParser(tag="tool", block_tags=("think", "answer"))
+
+    events = []
+    for char in text:
+        events.extend(parser.parse_chunk(char))
+    events.extend(parser.flush())
+
+    def content(kind, tag=None):
+        return "".join(
+            e.content for e in events if e.type == kind and e.mode == "append" and e.tag == tag
+        )
+
+    assert content("text") == "hi "
+    assert content("block", "think") == "a <tool> is literal here"
+    assert content("block", "answer") == "42"
+    assert not any(e.is_tool_call for e in events)
+
+
+def test_block_tags_unclosed_block_flushes():
+    """An unterminated block is closed on flush, keeping a partial close tag."""
+    parser = XMLParser(tag="tool", block_tags=("think",))
+    events = parser.parse_chunk("<think>still going</thi") + parser.flush()
+
+    assert [(e.type, e.mode) for e in events] == [
+        ("block", "create"),
+        ("block", "append"),
+        ("block", "append"),
+        ("block", "close"),
+    ]
+    assert "".join(e.content for e in events if e.mode == "append") == "still going</thi"
+
+
+def test_block_tag_cannot_be_tool_tag():
+    with pytest.raises(ValueError):
+        XMLParser(tag="tool", block_tags=("tool",))
+
+def test_tool_parser_reused_across_blocks(parser):
+    """One ToolParser instance is reset and reused for every tool block."""
+    tool_parser = parser.tool_parser
+    events = parser.parse(
+        "<use_tool><name>a</name><x>1</x></use_tool>"
+        "<use_tool><name>b</name><y>2</y></use_tool>"
+    )
+
+    assert parser.tool_parser is tool_parser
+    tools = [e.tool for e in events if e.is_tool_call]
+    assert [(t.name, t.args) for t in tools] == [("a", {"x": "1"}), ("b", {"y": "2"})]
+    # Closed tools keep their own args after the parser is reset
+    assert tools[0].args is not tools[1].args
+    assert tool_parser.current_tool_args == {}
+
+def _feed_chars(parser, text):
+    batches = [parser.parse_chunk(char) for char in text]
+    batches.append(parser.flush())
+    return batches
+
+
+def test_coalesce_merges_appends_within_chunk():
+    """Adjacent appends for one tool collapse into a single event per call."""
+    parser = XMLParser(tag="use_tool", coalesce=True)
+    events = parser.parse_chunk("<use_tool><name>t</name><a>1</a><b>2</b></use_tool>")
+
+    assert [(e.type, e.mode) for e in events] == [
+        ("tool", "create"),
+        ("tool", "append"),
+        ("tool", "close"),
+    ]
+    assert events[1].content == "12"
+    assert events[2].tool.args == {"a": "1", "b": "2"}
+
+
+def test_coalesce_min_chars_holds_appends_until_threshold():
+    """Held appends are released by size and never delay close events."""
+    text = "hello world, streaming <use_tool><name>t</name><a>value</a></use_tool>"
+    plain = [e for batch in _feed_chars(XMLParser(tag="use_tool"), text) for e in batch]
+    batches = _feed_chars(XMLParser(tag="use_tool", coalesce_min_chars=5), text)
+    coalesced = [e for batch in batches for e in batch]
+
+    def without_appends(events):
+        return [(e.type, e.mode) for e in events if e.mode != "append"]
+
+    def appended(events, kind):
+        return "".join(e.content for e in events if e.type == kind and e.mode == "append")
+
+    assert without_appends(coalesced) == without_appends(plain)
+    assert appended(coalesced, "text") == appended(plain, "text")
+    assert appended(coalesced, "tool") == appended(plain, "tool")
+    text_appends = [e.content for e in coalesced if e.type == "text" and e.mode == "append"]
+    # Only the append released early by the close may fall short of the threshold
+    assert all(len(content) >= 5 for content in text_appends[:-1])
+    assert len(text_appends) < len(appended(plain, "text"))
+    # The text close arrives in the same batch as the tool start tag, after its text
+    close_batch = next(b for b in batches if any(e.mode == "close" for e in b))
+    assert [(e.type, e.mode) for e in close_batch] == [("text", "append"), ("text", "close")]
+
+
+def test_event_coalescer_max_delay():
+    from ai_agent_toolbox.parser_utils import EventCoalescer
+    from ai_agent_toolbox.parser_event import ParserEvent
+
+    now = [0.0]
+    coalescer = EventCoalescer(max_delay=0.5, clock=lambda: now[0])
+
+    def append(content):
+        return ParserEvent(type="text", mode="append", id="t", content=content)
+
+    assert coalescer.coalesce([append("a")]) == []
+    now[0] = 0.2
+    assert coalescer.coalesce([append("b")]) == []
+    now[0] = 0.6
+    released = coalescer.coalesce([append("c")])
+    assert [e.content for e in released] == ["abc"]
+    assert coalescer.coalesce([append("d")], final=True)[0].content == "d"
+
+def test_default_ids_are_per_parser_counters():
+    """Blocks get distinct cheap ids, and separate parsers do not share ids."""
+    text = "a <use_tool><name>t</name></use_tool> b"
+    first = XMLParser(tag="use_tool").parse(text)
+    second = XMLParser(tag="use_tool").parse(text)
+
+    ids = list(dict.fromkeys(e.id for e in first))
+    assert len(ids) == 3
+    assert len({i.rsplit("-", 1)[0] for i in ids}) == 1
+    assert not set(ids) & {e.id for e in second}
+
+
+def test_custom_id_factory():
+    import uuid
+
+    from ai_agent_toolbox.parser_utils import uuid4_id
+
+    events = XMLParser(tag="use_tool", id_factory=uuid4_id).parse(
+        "a <use_tool><name>t</name></use_tool>"
+    )
+    for event in events:
+        uuid.UUID(event.id)
+
+    names = iter(["first", "second"])
+    events = XMLParser(tag="use_tool", id_factory=lambda: next(names)).parse(
+        "a <use_tool><name>t</name></use_tool>"
+    )
+    assert [e.id for e in events] == ["first"] * 3 + ["second"] * 2
+
+
+def test_event_types_filter_matches_full_parse():
+    """Filtered parses produce exactly the kept events of a full parse."""
+    text = (
+        "intro <think>plan</think> mid "
+        "<use_tool><name>calc</name><expr>1 + 1</expr></use_tool> outro <use_tool>"
+    )
+
+    def shape(events):
+        return [(e.type, e.mode, e.content, e.tag, e.tool) for e in events]
+
+    def streamed(parser):
+        events = []
+        for i in range(0, len(text), 3):
+            events.extend(parser.parse_chunk(text[i:i + 3]))
+        return events + parser.flush()
+
+    full = streamed(XMLParser(tag="use_tool", block_tags=("think",)))
+    for kinds in ({"tool"}, {"text"}, {"block", "tool"}):
+        filtered = streamed(XMLParser(tag="use_tool", block_tags=("think",), event_types=kinds))
+        assert shape(filtered) == shape([e for e in full if e.type in kinds])
+
+
+def test_tools_only_does_not_build_text():
+    parser = XMLParser(tag="use_tool", event_types={"tool"})
+    events = parser.parse_chunk("lots of text <use_tool><name>t</name><a>1</a></use_tool> <use")
+    assert [(e.type, e.mode) for e in events] == [("tool", "create"), ("tool", "append"), ("tool", "close")]
+    # Only the partial tag is kept between chunks
+    assert parser.outside_buffer == "<use"
+    assert parser.parse_chunk("ful text") == []
+    assert parser.flush() == []
+
+
+def test_unknown_event_type_rejected():
+    with pytest.raises(ValueError):
+        XMLParser(event_types={"tool", "tools"})
+
+
+def test_parse_bytes_chunk_splits_multibyte_characters():
+    text = "héllo 😀 <use_tool><name>t</name><a>日本</a></use_tool> ünï"
+    data = text.encode()
+    parser = XMLParser(tag="use_tool")
+    events = []
+    for i in range(len(data)):
+        events.extend(parser.parse_bytes_chunk(data[i:i + 1]))
+    events.extend(parser.flush())
+
+    text_out = "".join(e.content for e in events if e.type == "text" and e.mode == "append")
+    assert text_out == "héllo 😀  ünï"
+    close = next(e for e in events if e.mode == "close" and e.type == "tool")
+    assert close.tool.args == {"a": "日本"}
+
+
+def test_parse_bytes_chunk_tools_only_skips_text():
+    parser = XMLParser(tag="use_tool", event_types={"tool"})
+    data = "😀 text <use_tool><name>t</name></use_tool> ü".encode()
+    events = parser.parse_bytes_chunk(data[:1]) + parser.parse_bytes_chunk(memoryview(data)[1:])
+    events += parser.parse_bytes_chunk(bytearray("é".encode()[:1]))
+    assert [(e.type, e.mode) for e in events] == [("tool", "create"), ("tool", "close")]
+
+    with pytest.raises(UnicodeDecodeError):
+        parser.flush()
+
+    parser = XMLParser(tag="use_tool")
+    events = parser.parse_bytes_chunk(b"ok \xc3", errors="replace") + parser.flush()
+    assert "".join(e.content for e in events if e.mode == "append") == "ok �"
+
+
+def test_parse_stream_flushes_on_exhaustion():
+    chunks = ["a <use", "_tool><name>x</name>".encode(), "</use_tool> b"]
+    streamed = list(XMLParser(tag="use_tool").parse_stream(iter(chunks)))
+
+    manual = XMLParser(tag="use_tool")
+    expected = manual.parse_chunk("a <use")
+    expected += manual.parse_bytes_chunk(chunks[1])
+    expected += manual.parse_chunk(chunks[2]) + manual.flush()
+    assert [(e.type, e.mode, e.content) for e in streamed] == [
+        (e.type, e.mode, e.content) for e in expected
+    ]
+    assert streamed[-1].type == "text" and streamed[-1].mode == "close"
+
+
+def test_aparse_yields_events_and_batches():
+    import asyncio
+
+    async def source():
+        for chunk in ("a <use_tool><name>x</name>", "", "<v>1</v></use_tool>", " b"):
+            await asyncio.sleep(0)
+            yield chunk
+
+    async def run():
+        events = [e async for e in XMLParser(tag="use_tool").aparse(source())]
+        batches = [b async for b in XMLParser(tag="use_tool").aparse_batches(source())]
+        return events, batches
+
+    events, batches = asyncio.run(run())
+    assert batches and all(batches)
+    assert [(e.type, e.mode) for e in events] == [
+        (e.type, e.mode) for batch in batches for e in batch
+    ]
+    assert events[-1].type == "text" and events[-1].mode == "close"
+    assert next(e for e in events if e.mode == "close" and e.type == "tool").tool.args == {"v": "1"}
+
+
+def test_aparse_cancel_closes_source():
+    import asyncio
+
+    closed = []
+
+    async def source():
+        try:
+            yield "text <use_tool><name>x</name>"
+            await asyncio.sleep(10)
+            yield "</use_tool>"
+        finally:
+            closed.append(True)
+
+    async def run():
+        parser = XMLParser(tag="use_tool")
+        seen = []
+
+        async def consume():
+            async for event in parser.aparse(source()):
+                seen.append(event)
+
+        task = asyncio.ensure_future(consume())
+        while not seen:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return seen
+
+    seen = asyncio.run(run())
+    assert closed == [True]
+    # Nothing is flushed after cancellation
+    assert not any(e.mode == "close" and e.type == "tool" for e in seen)
+
+
+def test_snapshot_restore_resumes_exactly():
+    text = (
+        "intro <think>plan é</think> <use_tool><name>write</name><body>"
+        + "line 😀\n" * 20
+        + "</body></use_tool> outro <use_tool><name>x"
+    )
+    chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+    options = dict(tag="use_tool", block_tags=("think",), coalesce_min_chars=10)
+
+    uninterrupted = XMLParser(**options)
+    expected = [e for chunk in chunks for e in uninterrupted.parse_chunk(chunk)] + uninterrupted.flush()
+
+    parser = XMLParser(**options)
+    parser.id_factory.prefix = uninterrupted.id_factory.prefix
+    events = []
+    for chunk in chunks:
+        events.extend(parser.parse_chunk(chunk))
+        data = parser.snapshot()
+        assert isinstance(data, bytes)
+        parser = XMLParser.restore(data)
+    events.extend(parser.flush())
+    assert events == expected
+
+
+def test_snapshot_size_tracks_buffer_not_history():
+    parser = XMLParser(tag="use_tool")
+    for _ in range(1000):
+        parser.parse_chunk("some text <use_tool><name>t</name><a>1</a></use_tool> ")
+    assert len(parser.snapshot()) < 1000
+
+    restored = XMLParser.restore(parser.snapshot())
+    assert [e.mode for e in restored.parse("<use_tool><name>t</name></use_tool>")][-1] == "close"
+
+
+def test_restore_errors():
+    with pytest.raises(ValueError):
+        XMLParser.restore(b"not a snapshot")
+
+    # Truncated anywhere, including inside the header
+    data = XMLParser().snapshot()
+    for size in (5, len(data) // 2, len(data) - 1):
+        with pytest.raises(ValueError, match="snapshot"):
+            XMLParser.restore(data[:size])
+
+    data = XMLParser(id_factory=lambda: "fixed").snapshot()
+    with pytest.raises(ValueError):
+        XMLParser.restore(data)
+    restored = XMLParser.restore(data, id_factory=lambda: "fixed")
+    assert {e.id for e in restored.parse("text")} == {"fixed"}
+
+
+def test_fork_branches_independently():
+    prefix = "intro <use_tool><name>write</name><body>shared "
+    parser = XMLParser(tag="use_tool")
+    parser.parse_chunk(prefix)
+
+    branches = {}
+    for suffix in ("left</body></use_tool>", "right</body></use_tool> tail"):
+        fork = parser.fork()
+        branches[suffix] = fork.parse_chunk(suffix) + fork.flush()
+
+    for suffix, events in branches.items():
+        unforked = XMLParser(tag="use_tool")
+        unforked.id_factory.prefix = parser.id_factory.prefix
+        unforked.parse_chunk(prefix)
+        assert events == unforked.parse_chunk(suffix) + unforked.flush()
+
+    # The original is untouched by its forks
+    close = [e for e in parser.parse_chunk("orig</body></use_tool>") if e.mode == "close"]
+    assert close[0].tool.args == {"body": "shared orig"}
+
+
+def test_spill_threshold_moves_long_args_to_disk(tmp_path):
+    parser = XMLParser(tag="use_tool", spill_threshold=10, spill_dir=str(tmp_path))
+    body = "line\r\n" * 20
+    chunks = ["<use_tool><name>write</name><path>a.txt</path><content>"]
+    chunks += [body[i:i + 7] for i in range(0, len(body), 7)]
+    chunks.append("</content></use_tool>")
+    events = []
+    for chunk in chunks:
+        events.extend(parser.parse_chunk(chunk))
+    events.extend(parser.flush())
+
+    args = [e for e in events if e.mode == "close"][0].tool.args
+    assert args["path"] == "a.txt" and isinstance(args["path"], str)
+    content = args["content"]
+    assert isinstance(content, SpilledArg)
+    assert len(content) == len(body)
+    assert content == body and content.read() == body
+    assert "".join(content.iter_chunks(5)) == body
+    assert os.path.dirname(content.path) == str(tmp_path)
+    assert pickle.loads(pickle.dumps(content)) == body
+
+    content.discard()
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc/self/fd")
+def test_spilled_args_hold_no_descriptor_once_closed(tmp_path):
+    def open_fds():
+        return len(os.listdir("/proc/self/fd"))
+
+    parser = XMLParser(tag="use_tool", spill_threshold=3, spill_dir=str(tmp_path))
+    before = open_fds()
+    values = [
+        event.tool.args["content"]
+        for event in parser.parse("<use_tool><name>w</name><content>spilled</content></use_tool>" * 20)
+        if event.mode == "close"
+    ]
+    assert open_fds() == before
+    assert len(os.listdir(tmp_path)) == 20
+    assert all(value.read() == "spilled" for value in values)
+    assert open_fds() == before
+
+
+def test_spilled_args_of_unfinished_tool_are_removed(tmp_path):
+    parser = XMLParser(tag="use_tool", spill_threshold=3, spill_dir=str(tmp_path))
+    parser.parse_chunk("<use_tool><name>write</name><content>long enough")
+    assert len(os.listdir(tmp_path)) == 1
+
+    # A snapshot holds the spilled text inline; the restored parser spills again
+    restored = XMLParser.restore(parser.snapshot())
+    events = restored.parse_chunk("!</content></use_tool>")
+    assert events[-1].tool.args["content"] == "long enough!"
+    assert len(os.listdir(tmp_path)) == 2
+
+    parser.tool_parser.reset()
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_lazy_args_are_spans_into_the_text():
+    text = "hi <use_tool><name>write</name><path>a.txt</path><content>x < y</content></use_tool>"
+    events = XMLParser(tag="use_tool", lazy_args=True).parse(text)
+    assert [e.mode for e in events if e.type == "tool"] == ["create", "close"]
+
+    args = events[-1].tool.args
+    assert args == {"path": "a.txt", "content": "x < y"}
+    content = args["content"]
+    assert isinstance(content, ArgSpan)
+    assert content.source is text
+    assert text[content.start:content.end] == "x < y" and len(content) == 5
+    assert pickle.loads(pickle.dumps(content)) == "x < y"
+
+    # Split across chunks, a value is joined into a str
+    parser = XMLParser(tag="use_tool", lazy_args=True)
+    events = (
+        parser.parse_chunk("<use_tool><name>write</name><content>first ")
+        + parser.parse_chunk("second</content></use_tool>")
+        + parser.flush()
+    )
+    assert events[-1].tool.args == {"content": "first second"}
+    assert type(events[-1].tool.args["content"]) is str
+
+
+def test_event_offsets_slice_the_source():
+    text = "Hi <think>hmm</think> then <use_tool><name>calc</name><a>1</a><b>x</b></use_tool> bye"
+    parser = XMLParser(tag="use_tool", block_tags=("think",))
+    events = []
+    for i in range(0, len(text), 6):
+        events.extend(parser.parse_bytes_chunk(text[i:i + 6].encode()))
+    events.extend(parser.flush())
+
+    for event in events:
+        if event.mode == "append":
+            assert text[event.start:event.end] == event.content
+
+    block, tool = [e for e in events if e.mode == "close" and e.type != "text"]
+    assert text[block.start:block.end] == "<think>hmm</think>"
+    assert text[tool.start:tool.end] == "<use_tool><name>calc</name><a>1</a><b>x</b></use_tool>"
+    assert {name: text[start:end] for name, (start, end) in tool.tool.offsets.items()} == tool.tool.args
+    create = [e for e in events if e.id == tool.id][0]
+    assert create.mode == "create" and create.start == tool.start
+
+    # A repeated argument is joined, and its offsets are the outer bounds
+    text = "<use_tool><name>n</name><a>1</a><b>2</b><a>3</a></use_tool>"
+    for lazy_args in (False, True):
+        tool = XMLParser(tag="use_tool", lazy_args=lazy_args).parse(text)[-1].tool
+        assert tool.args == {"a": "13", "b": "2"}
+        start, end = tool.offsets["a"]
+        assert text[start:end] == "1</a><b>2</b><a>3"
+
+
+def test_stats_count_chunks_events_and_buffers():
+    stats = ParserStats()
+    parser = XMLParser(tag="use_tool", stats=stats)
+    chunks = ["Hi <use", "_tool><name>ca", "lc</name><a>1", "</a></use_tool>", "<use_tool></use_tool>"]
+    for chunk in chunks:
+        parser.parse_chunk(chunk)
+    parser.flush()
+
+    counts = stats.as_dict()
+    assert counts["chunks"] == 5
+    assert counts["chars"] == sum(len(chunk) for chunk in chunks)
+    assert counts["events"] == {
+        "text.create": 1, "text.append": 1, "text.close": 1,
+        "tool.create": 1, "tool.append": 1, "tool.close": 1,
+    }
+    assert counts["tool_blocks"] == 1 and counts["nameless_blocks"] == 1
+    assert counts["outside_buffer_high"] == len("<use")
+    assert counts["tool_buffer_high"] == len("<name>ca")
+    assert counts["parse_seconds"] > 0
+
+    # Shared by a fork, and untouched by a parser without stats
+    parser.fork().parse_chunk("more")
+    XMLParser(tag="use_tool").parse("ignored")
+    assert stats.chunks == 6
@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ai_agent_toolbox import ToolUse, XMLParser, parse_many
+
+
+def _texts(count):
+    return [
+        f"reply {i} <use_tool><name>calc</name><n>{i}</n></use_tool> <think>done</think>"
+        for i in range(count)
+    ]
+
+
+def _shape(events):
+    return [(e.type, e.mode, e.content, e.tag, e.tool, e.is_tool_call) for e in events]
+
+
+def test_parse_many_matches_sequential_parse():
+    texts = _texts(25)
+    expected = [_shape(XMLParser(tag="use_tool", block_tags=("think",)).parse(t)) for t in texts]
+
+    for workers in (1, 2):
+        results = parse_many(texts, workers=workers, chunksize=4, tag="use_tool", block_tags=("think",))
+        assert [_shape(events) for events in results] == expected
+
+
+def test_parse_many_tool_uses():
+    results = parse_many(_texts(5), workers=2, output="tool_uses", tag="use_tool")
+    assert results == [[ToolUse(name="calc", args={"n": str(i)})] for i in range(5)]
+
+
+def test_parse_many_with_executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = parse_many(_texts(6), executor=executor, output="tool_uses", tag="use_tool")
+    assert [tools[0].args["n"] for tools in results] == [str(i) for i in range(6)]
+
+
+def test_parse_many_rejects_unknown_output():
+    with pytest.raises(ValueError):
+        parse_many(["x"], output="tools")
+
+
+PARALLEL_DOCUMENTS = [
+    # Plain run of top-level tools
+    "".join(
+        f"step {i} <use_tool><name>calc</name><n>{i}</n></use_tool>\n" for i in range(40)
+    ),
+    # Start tags inside a block, a tool argument and an unclosed tool
+    "a <think>x <use_tool> y</think> <use_tool><name>w</name><body>"
+    "<use_tool> text</body></use_tool> b <use_tool><name>open</name><v>1",
+    # A nameless block takes the next <name> in the document
+    "<use_tool></use_tool> one <use_tool> two <use_tool><name>n</name></use_tool> three",
+]
+
+
+@pytest.mark.parametrize("document", PARALLEL_DOCUMENTS)
+@pytest.mark.parametrize("segment_chars", [1, 7, 50])
+def test_parse_parallel_matches_sequential(document, segment_chars):
+    from ai_agent_toolbox.parser_utils import counter_id_factory
+
+    options = dict(tag="use_tool", block_tags=("think",))
+    expected = XMLParser(id_factory=counter_id_factory("doc"), **options).parse(document)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        parser = XMLParser(id_factory=counter_id_factory("doc"), **options)
+        result = parser.parse_parallel(document, executor=executor, segment_chars=segment_chars)
+    assert result == expected
+
+
+def test_parse_parallel_process_pool():
+    from ai_agent_toolbox.parser_utils import counter_id_factory
+
+    document = PARALLEL_DOCUMENTS[0] * 5
+    expected = XMLParser(tag="use_tool", id_factory=counter_id_factory("doc")).parse(document)
+    parser = XMLParser(tag="use_tool", id_factory=counter_id_factory("doc"))
+    assert parser.parse_parallel(document, workers=2, segment_chars=500) == expected
+
+
+def test_parse_parallel_raises_sequential_error():
+    from ai_agent_toolbox import ToolParseError
+
+    document = "ok <use_tool><name>a</name></use_tool> then <use_tool><name></name></use_tool>"
+    with pytest.raises(ToolParseError):
+        XMLParser(tag="use_tool").parse(document)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(ToolParseError):
+            XMLParser(tag="use_tool").parse_parallel(document, executor=executor, segment_chars=5)
@@ -0,0 +1,40 @@
+import pytest
+
+from ai_agent_toolbox import ToolUse, XMLParser, iter_file_events, parse_file
+
+DOCUMENT = "héllo 😀 <use_tool><name>calc</name><n>日本</n></use_tool> ünï <use_tool><name>b</name></use_tool>"
+
+
+def _shape(events):
+    return [(e.type, e.mode, e.tool) for e in events if e.mode != "append"]
+
+
+def _text(events):
+    return "".join(e.content for e in events if e.type == "text" and e.mode == "append")
+
+
+@pytest.mark.parametrize("window_bytes", [1, 3, 7, 1 << 20])
+def test_iter_file_events_matches_parse(tmp_path, window_bytes):
+    path = tmp_path / "transcript.txt"
+    path.write_text(DOCUMENT, encoding="utf-8")
+
+    events = list(iter_file_events(path, window_bytes=window_bytes, tag="use_tool"))
+    expected = XMLParser(tag="use_tool").parse(DOCUMENT)
+    assert _shape(events) == _shape(expected)
+    assert _text(events) == _text(expected)
+
+
+def test_parse_file_tool_uses(tmp_path):
+    path = tmp_path / "transcript.txt"
+    path.write_text(DOCUMENT, encoding="utf-8")
+
+    assert parse_file(str(path), output="tool_uses", window_bytes=5, tag="use_tool") == [
+        ToolUse(name="calc", args={"n": "日本"}),
+        ToolUse(name="b", args={}),
+    ]
+
+
+def test_parse_file_empty(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert parse_file(path) == []
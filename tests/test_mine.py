@@ -0,0 +1,79 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_agent_toolbox.mine import main, mine, mine_lines
+
+
+def _write_log(path, count):
+    with open(path, "w", encoding="utf-8") as file:
+        for i in range(count):
+            content = f"hi {i} <use_tool><name>search</name><q>é{i}</q></use_tool> bye"
+            file.write(json.dumps({"id": i, "choices": [{"text": content}]}) + "\n")
+        file.write("not json\n")
+        file.write(json.dumps({"id": "no field"}) + "\n")
+
+
+def test_mine_cli_writes_tool_records(tmp_path):
+    log = tmp_path / "log.jsonl"
+    out = tmp_path / "tools.jsonl"
+    _write_log(log, 3)
+
+    assert main([str(log), "--field", "choices.0.text", "--tag", "use_tool", "-j", "1", "-o", str(out), "-q"]) == 0
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [(r["line"], r["name"], r["args"]) for r in records] == [
+        (i + 1, "search", {"q": f"é{i}"}) for i in range(3)
+    ]
+    text = "hi 0 <use_tool><name>search</name><q>é0</q></use_tool> bye"
+    assert text[records[0]["start"]:records[0]["end"]] == "<use_tool><name>search</name><q>é0</q></use_tool>"
+    assert records[0]["source"] == str(log)
+
+
+def test_mine_ordered_and_unordered(tmp_path):
+    log = tmp_path / "log.jsonl"
+    _write_log(log, 50)
+
+    results = {}
+    for ordered in (True, False):
+        output = io.StringIO()
+        progress = io.StringIO()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            totals = mine(
+                [str(log)],
+                output,
+                field="choices.0.text",
+                tag="use_tool",
+                ordered=ordered,
+                batch_lines=4,
+                max_pending=2,
+                progress=progress,
+                executor=executor,
+            )
+        assert totals["lines"] == 52
+        assert totals["tool_uses"] == 50
+        assert totals["errors"] == 2
+        assert progress.getvalue().startswith("done: 52 lines")
+        results[ordered] = [json.loads(line)["line"] for line in output.getvalue().splitlines()]
+
+    assert results[True] == list(range(1, 51))
+    assert sorted(results[False]) == results[True]
+
+
+def test_mine_skips_malformed_tool_blocks(tmp_path):
+    texts = [
+        "<use_tool><name>a</name><q>1</q></use_tool>",
+        "<use_tool><name></name><q>2</q></use_tool>",
+        "<use_tool><name>c</name><q>3</q></use_tool>",
+    ]
+    lines = [(i, json.dumps({"text": text}).encode()) for i, text in enumerate(texts, 1)]
+
+    result = mine_lines("log", lines, ["text"], "use_tool")
+    assert [json.loads(record)["line"] for record in result.records] == [1, 3]
+    assert (result.lines, result.tool_uses, result.errors) == (3, 2, 1)
+
+    log = tmp_path / "log.jsonl"
+    log.write_bytes(b"\n".join(raw for _, raw in lines) + b"\n")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        totals = mine([str(log)], io.StringIO(), field="text", tag="use_tool", batch_lines=1, executor=executor)
+    assert (totals["tool_uses"], totals["errors"]) == (2, 1)
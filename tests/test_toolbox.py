@@ -1,9 +1,21 @@
+import asyncio
+import functools
 import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from unittest.mock import Mock
 
 import pytest
 
-from ai_agent_toolbox.toolbox import Toolbox, ToolConflictError
+from ai_agent_toolbox import toolbox as toolbox_module
+from ai_agent_toolbox.toolbox import (
+    DEFAULT_MAX_WORKERS,
+    Toolbox,
+    ToolArgumentError,
+    ToolConflictError,
+    ToolTimeoutError,
+)
 from ai_agent_toolbox.parser_event import ParserEvent
 from ai_agent_toolbox.tool_use import ToolUse
 
@@ -277,3 +289,513 @@ def test_custom_parser_invoked():
         {"key": "b", "value": 2},
     ]
     assert response.result == {"payload": {"a": 1, "b": 2}}
+
+
+def test_choices_accept_hashable_and_unhashable_values():
+    toolbox = Toolbox()
+    toolbox.add_tool(
+        name="pick",
+        fn=lambda **kwargs: kwargs,
+        args={
+            "level": {"type": "enum", "choices": ["low", "high"]},
+            "pair": {"type": "list", "choices": [[1, 2], [3, 4]]},
+            "config": {"type": "dict", "choices": ({"a": 1},)},
+        },
+    )
+    event = ParserEvent(
+        type="tool",
+        mode="close",
+        id="test-id",
+        tool=ToolUse(name="pick", args={"level": "high", "pair": "[3, 4]", "config": '{"a": 1}'}),
+        is_tool_call=True,
+    )
+    assert toolbox.use(event).result == {"level": "high", "pair": [3, 4], "config": {"a": 1}}
+
+    event.tool.args["pair"] = "[5]"
+    with pytest.raises(ValueError, match="allowed choices"):
+        toolbox.use(event)
+
+
+def test_choices_keep_the_membership_test_of_other_containers():
+    toolbox = Toolbox()
+    toolbox.add_tool(
+        name="pick",
+        fn=lambda **kwargs: kwargs,
+        # A huge range is neither expanded nor iterated, and a str matches substrings
+        args={
+            "n": {"type": "int", "choices": range(0, 10**18, 2)},
+            "code": {"type": "string", "choices": "abcdef"},
+        },
+    )
+    assert toolbox.use(tool_event("pick", n="42", code="cde")).result == {"n": 42, "code": "cde"}
+    with pytest.raises(ValueError, match="allowed choices"):
+        toolbox.use(tool_event("pick", n="43", code="cde"))
+    with pytest.raises(ValueError, match="allowed choices"):
+        toolbox.use(tool_event("pick", n="42", code="ace"))
+
+
+def test_invalid_schema_rejected_at_registration():
+    toolbox = Toolbox()
+    with pytest.raises(TypeError, match="must be callable"):
+        toolbox.add_tool("bad", fn=lambda **kwargs: None, args={"x": {"type": "int", "parser": 3}})
+    with pytest.raises(TypeError, match="must be a dict or string"):
+        toolbox.add_tool("worse", fn=lambda **kwargs: None, args={"x": 3})
+
+
+def tool_event(name, **args):
+    return ParserEvent(
+        type="tool", mode="close", id=name, tool=ToolUse(name=name, args=args), is_tool_call=True
+    )
+
+
+def make_concurrent_toolbox():
+    """Toolbox whose "first" call only finishes once "second" has started.
+
+    "first" also waits for the returned ``release`` event, when set.
+    """
+    second_started = threading.Event()
+    release = threading.Event()
+    release.set()
+    toolbox = Toolbox()
+
+    def first():
+        assert second_started.wait(5) and release.wait(5)
+        return 1
+
+    def second():
+        second_started.set()
+        return 2
+
+    async def third(n):
+        await asyncio.sleep(0)
+        return n
+
+    def broken():
+        raise RuntimeError("boom")
+
+    toolbox.add_tool("first", first, {})
+    toolbox.add_tool("second", second, {})
+    toolbox.add_tool("third", third, {"n": "int"})
+    toolbox.add_tool("broken", broken, {})
+    return toolbox, release
+
+
+def test_use_many_runs_concurrently_and_reports_errors():
+    toolbox, _ = make_concurrent_toolbox()
+    events = [
+        tool_event("first"),
+        tool_event("second"),
+        tool_event("broken"),
+        tool_event("third", n="x"),
+        tool_event("third", n="3"),
+        tool_event("unknown"),
+    ]
+
+    responses = list(toolbox.use_many(events))
+    assert [r.tool.name for r in responses] == ["first", "second", "broken", "third", "third"]
+    assert [r.result for r in responses] == [1, 2, None, None, 3]
+    assert isinstance(responses[2].error, RuntimeError)
+    assert isinstance(responses[3].error, ToolArgumentError)
+
+    # "first" is held until a response has been received
+    toolbox, release = make_concurrent_toolbox()
+    release.clear()
+    names = []
+    for response in toolbox.use_many(events[:2], ordered=False):
+        names.append(response.tool.name)
+        release.set()
+    assert names == ["second", "first"]
+
+    # Without max_concurrency, a large batch still uses a bounded pool
+    def where():
+        time.sleep(0.01)
+        return threading.get_ident()
+
+    toolbox = Toolbox()
+    toolbox.add_tool("where", where, {})
+    events = [tool_event("where")] * (DEFAULT_MAX_WORKERS * 4)
+    threads = {response.result for response in toolbox.use_many(events)}
+    assert 1 <= len(threads) <= DEFAULT_MAX_WORKERS
+
+
+def test_use_many_async_respects_max_concurrency():
+    running = 0
+    peak = 0
+
+    async def slow(n):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return n
+
+    toolbox = Toolbox()
+    toolbox.add_tool("slow", slow, {"n": "int"})
+    events = [tool_event("slow", n=str(i)) for i in range(6)]
+
+    async def collect(**options):
+        return [r.result async for r in toolbox.use_many_async(events, **options)]
+
+    assert asyncio.run(collect(max_concurrency=2)) == list(range(6))
+    assert peak == 2
+    assert asyncio.run(collect()) == list(range(6))
+    assert peak == 6
+
+    # Sync tools run in threads, so "first" can wait for "second"
+    toolbox, release = make_concurrent_toolbox()
+    release.clear()
+
+    async def completed():
+        names = []
+        async for response in toolbox.use_many_async(
+            [tool_event("first"), tool_event("second")], ordered=False
+        ):
+            names.append(response.tool.name)
+            release.set()
+        return names
+
+    assert asyncio.run(completed()) == ["second", "first"]
+
+
+def test_execution_policies():
+    started = threading.Event()
+
+    def blocking():
+        return started.wait(5)
+
+    async def unblock():
+        started.set()
+        return True
+
+    # Sync tools run on the loop's thread unless they opt into a pool
+    toolbox = Toolbox()
+    toolbox.add_tool("where", threading.current_thread, {})
+    assert asyncio.run(toolbox.use_async(tool_event("where"))).result is threading.current_thread()
+
+    # A thread tool waits for a coroutine on the same loop
+    toolbox.add_tool("blocking", blocking, {}, execution="thread")
+    toolbox.add_tool("unblock", unblock, {})
+
+    async def both():
+        return await asyncio.gather(
+            toolbox.use_async(tool_event("blocking")), toolbox.use_async(tool_event("unblock"))
+        )
+
+    assert [r.result for r in asyncio.run(both())] == [True, True]
+
+    # Process tools get converted arguments and return pickled results
+    toolbox = Toolbox(execution="process")
+    toolbox.add_tool("dumps", json.dumps, {"obj": "list"})
+    try:
+        assert toolbox.use(tool_event("dumps", obj="[1, 2]")).result == "[1, 2]"
+        response = asyncio.run(toolbox.use_async(tool_event("dumps", obj="[3]")))
+        assert response.result == "[3]"
+    finally:
+        toolbox.shutdown()
+
+    with pytest.raises(ValueError):
+        Toolbox(execution="fiber")
+    with pytest.raises(ValueError):
+        toolbox.add_tool("unblock", unblock, {}, execution="thread")
+
+
+def test_timeouts_and_deadlines():
+    release = threading.Event()
+    cancelled = []
+
+    async def hang():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    # Its own executor, as asyncio.run waits for the default one to go idle
+    executor = ThreadPoolExecutor()
+    toolbox = Toolbox(execution="thread", thread_executor=executor)
+    toolbox.add_tool("hang", hang, {}, timeout=0.05)
+    toolbox.add_tool("block", lambda: release.wait(5), {}, timeout=0.05)
+    toolbox.add_tool("quick", lambda: "done", {})
+
+    async def run(name, **options):
+        response = await toolbox.use_async(tool_event(name), **options)
+        await asyncio.sleep(0)
+        return response
+
+    with pytest.raises(ToolTimeoutError) as info:
+        asyncio.run(run("hang"))
+    assert info.value.tool_name == "hang"
+    assert cancelled == [True]
+    with pytest.raises(ToolTimeoutError):
+        asyncio.run(run("block"))
+    with pytest.raises(ToolTimeoutError):
+        toolbox.use(tool_event("block"))
+    with pytest.raises(ToolTimeoutError):
+        toolbox.use(tool_event("quick"), deadline=time.monotonic())
+    assert asyncio.run(run("quick", deadline=time.monotonic() + 5)).result == "done"
+
+    # One deadline bounds every call, and expired calls become error responses
+    events = [tool_event("hang"), tool_event("quick")]
+    deadline = time.monotonic() + 0.02
+    responses = list(toolbox.use_many(events, deadline=deadline))
+    assert isinstance(responses[0].error, ToolTimeoutError)
+    assert responses[1].result == "done"
+
+    async def collect():
+        return [r async for r in toolbox.use_many_async(events, deadline=deadline)]
+
+    responses = asyncio.run(collect())
+    assert [type(r.error) for r in responses] == [ToolTimeoutError, ToolTimeoutError]
+    release.set()
+    executor.shutdown()
+
+    with pytest.raises(ValueError):
+        toolbox.add_tool("inline", lambda: None, {}, execution="inline", timeout=1)
+    with pytest.raises(ValueError):
+        toolbox.add_tool("zero", lambda: None, {}, timeout=0)
+
+
+def test_process_timeouts_free_the_worker(monkeypatch):
+    # One worker, so a call left running would starve the next one
+    monkeypatch.setattr(
+        toolbox_module, "ProcessPoolExecutor", functools.partial(ProcessPoolExecutor, max_workers=1)
+    )
+    toolbox = Toolbox(execution="process")
+    toolbox.add_tool("slow", functools.partial(time.sleep, 5), {}, timeout=0.1)
+    toolbox.add_tool("dumps", json.dumps, {"obj": "list"}, timeout=2)
+    toolbox.add_tool("loads", json.loads, {"s": "string"})
+    try:
+        with pytest.raises(ToolTimeoutError):
+            toolbox.use(tool_event("slow"))
+        assert toolbox.use(tool_event("dumps", obj="[1]")).result == "[1]"
+        assert toolbox.use(tool_event("loads", s="[1]")).result == [1]
+        with pytest.raises(ToolTimeoutError):
+            asyncio.run(toolbox.use_async(tool_event("slow")))
+        response = asyncio.run(toolbox.use_async(tool_event("dumps", obj="[2]")))
+        assert response.result == "[2]"
+    finally:
+        toolbox.shutdown()
+
+
+def test_process_timeouts_leave_other_calls_running():
+    toolbox = Toolbox(execution="process")
+    toolbox.add_tool("slow", functools.partial(time.sleep, 5), {}, timeout=0.2)
+    toolbox.add_tool("pooled", functools.partial(time.sleep, 0.5), {})
+    toolbox.add_tool("timed", functools.partial(time.sleep, 0.5), {}, timeout=3)
+    events = [tool_event("pooled"), tool_event("slow"), tool_event("timed")]
+    try:
+        responses = list(toolbox.use_many(events))
+        assert isinstance(responses[1].error, ToolTimeoutError)
+        assert [responses[0].error, responses[2].error] == [None, None]
+
+        async def collect():
+            return [response async for response in toolbox.use_many_async(events)]
+
+        responses = asyncio.run(collect())
+        assert isinstance(responses[1].error, ToolTimeoutError)
+        assert [responses[0].error, responses[2].error] == [None, None]
+    finally:
+        toolbox.shutdown()
+
+
+def test_concurrency_and_rate_limits():
+    running = 0
+    peak = 0
+
+    async def backend(n):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return n
+
+    toolbox = Toolbox()
+    toolbox.add_tool("backend", backend, {"n": "int"}, max_concurrency=2)
+    toolbox.add_tool("metered", time.monotonic, {}, execution="inline", rate=50, burst=1)
+    toolbox.add_tool("free", backend, {"n": "int"})
+
+    async def call_all(name, count, **options):
+        calls = [
+            toolbox.use_async(tool_event(name, n=str(i)), **options) for i in range(count)
+        ]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    # Callers share the limit, also on a later event loop
+    for _ in range(2):
+        assert [r.result for r in asyncio.run(call_all("backend", 6))] == list(range(6))
+        assert peak == 2
+    stats = toolbox.limit_stats()
+    assert list(stats) == ["backend", "metered"]
+    assert stats["backend"].as_dict()["calls"] == 12
+    assert stats["backend"].queued == stats["backend"].running == 0
+    assert stats["backend"].max_wait_seconds > 0
+
+    # Four calls at 50/s with no burst allowance span at least 60 ms
+    started = [r.result for r in asyncio.run(call_all("metered", 4))]
+    assert started[-1] - started[0] >= 0.05
+
+    # Waiting for a slot counts against the deadline
+    release = asyncio.Event()
+    started = []
+
+    async def hold(n):
+        started.append(n)
+        await release.wait()
+        return n
+
+    toolbox.add_tool("held", hold, {"n": "int"}, max_concurrency=2)
+
+    async def late_call():
+        busy = asyncio.ensure_future(call_all("held", 2))
+        while len(started) < 2:
+            await asyncio.sleep(0)
+        deadline = time.monotonic() + 0.05
+        with pytest.raises(ToolTimeoutError) as raised:
+            await toolbox.use_async(tool_event("held", n="2"), deadline=deadline)
+        release.set()
+        return await busy, raised.value
+
+    busy, late = asyncio.run(late_call())
+    assert [r.result for r in busy] == [0, 1]
+    assert started == [0, 1]
+    assert 0.04 < late.timeout <= 0.05
+    assert str(late) == f"Tool 'held' timed out after {late.timeout:.3g}s"
+    held = toolbox.limit_stats()["held"]
+    assert held.queued == held.running == 0
+
+    with pytest.raises(ValueError):
+        toolbox.add_tool("bad", backend, {}, max_concurrency=0)
+    with pytest.raises(ValueError):
+        toolbox.add_tool("bad", backend, {}, rate=-1)
+
+
+def test_limits_apply_across_threads_and_loops():
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def enter():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+
+    def leave():
+        nonlocal running
+        with lock:
+            running -= 1
+
+    def work(n):
+        enter()
+        time.sleep(0.01)
+        leave()
+        return n
+
+    async def backend(n):
+        enter()
+        await asyncio.sleep(0.01)
+        leave()
+        return n
+
+    toolbox = Toolbox()
+    toolbox.add_tool("work", work, {"n": "int"}, max_concurrency=1)
+    toolbox.add_tool("backend", backend, {"n": "int"}, max_concurrency=1)
+
+    # use_many's threads and plain use() wait for the one slot
+    events = [tool_event("work", n=str(i)) for i in range(4)]
+    assert [r.result for r in toolbox.use_many(events)] == [0, 1, 2, 3]
+    assert toolbox.use(tool_event("work", n="4")).result == 4
+    assert peak == 1
+
+    # Event loops in two threads share the slot, and none is left waiting
+    results = []
+
+    def run_loop():
+        async def call_all():
+            calls = [toolbox.use_async(tool_event("backend", n=str(i))) for i in range(3)]
+            return await asyncio.gather(*calls)
+
+        results.extend(r.result for r in asyncio.run(call_all()))
+
+    threads = [threading.Thread(target=run_loop) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+    assert sorted(results) == [0, 0, 1, 1, 2, 2]
+    assert peak == 1
+
+    # A blocking caller times out while another thread holds the slot
+    release = threading.Event()
+    toolbox.add_tool("held", lambda: release.wait(5), {}, max_concurrency=1)
+    holder = threading.Thread(target=toolbox.use, args=(tool_event("held"),))
+    holder.start()
+    while toolbox.limit_stats()["held"].running == 0:
+        time.sleep(0.001)
+    with pytest.raises(ToolTimeoutError):
+        toolbox.use(tool_event("held"), deadline=time.monotonic() + 0.01)
+    release.set()
+    holder.join(5)
+
+    stats = toolbox.limit_stats()
+    assert stats["work"].calls == 5
+    assert stats["backend"].calls == 6
+    assert stats["held"].calls == 1
+    for counters in stats.values():
+        assert counters.queued == counters.running == 0
+
+
+def test_spilled_args(tmp_path):
+    from ai_agent_toolbox import SpilledArg, XMLParser
+
+    received = {}
+
+    def write(content, count, items):
+        received.update(content=content, count=count, items=items)
+
+    toolbox = Toolbox(max_spilled_chars=8)
+    toolbox.add_tool("write", write, {"content": "string", "count": "int", "items": "list"})
+    parser = XMLParser(tag="use_tool", spill_threshold=2, spill_dir=str(tmp_path))
+    text = "<use_tool><name>write</name><content>a long body</content><count>42</count><items>[1]</items></use_tool>"
+    events = parser.parse(text)
+
+    # Strings stay on disk for the tool to stream; other types are read and converted
+    toolbox.use(events[-1])
+    assert isinstance(received["content"], SpilledArg)
+    assert "".join(received["content"].iter_chunks(4)) == "a long body"
+    assert received["count"] == 42 and received["items"] == [1]
+
+    toolbox = Toolbox(max_spilled_chars=8)
+    toolbox.add_tool("write", write, {"content": "dict"})
+    with pytest.raises(ToolArgumentError, match="limit"):
+        toolbox.use(events[-1])
+
+
+def test_lazy_args_convert_for_every_type():
+    from ai_agent_toolbox import ArgSpan, XMLParser
+
+    schemas = {
+        "s": ("string", "text", "text"),
+        "i": ({"type": "int", "min": 0}, "42", 42),
+        "f": ("float", "2.5", 2.5),
+        "b": ("bool", "yes", True),
+        "l": ("list", "[1, 2]", [1, 2]),
+        "d": ("dict", '{"k": "v"}', {"k": "v"}),
+        "e": ({"type": "enum", "choices": ["low", "high"]}, "high", "high"),
+    }
+    body = "".join(f"<{name}>{raw}</{name}>" for name, (_, raw, _) in schemas.items())
+    text = f"<use_tool><name>typed</name>{body}</use_tool>"
+    event = XMLParser(tag="use_tool", lazy_args=True).parse(text)[-1]
+    assert all(isinstance(value, ArgSpan) for value in event.tool.args.values())
+
+    toolbox = Toolbox()
+    toolbox.add_tool("typed", lambda **kwargs: kwargs, {name: schema for name, (schema, _, _) in schemas.items()})
+    result = toolbox.use(event).result
+    assert result == {name: expected for name, (_, _, expected) in schemas.items()}
+    assert type(result["s"]) is str
+
+    # Spans serialize as the text they stand for
+    assert json.loads(json.dumps(event.tool.args, default=str))["i"] == "42"
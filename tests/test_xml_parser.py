@@ -100,3 +100,23 @@ def test_xml_parser_invalid_tool_promotes_text(xml_event_goldens, normalize_even
     events.extend(parser.flush())
     actual = normalize_events(events)
     assert actual == xml_event_goldens["invalid_tool_fallback"]
+
+
+def test_event_constants_stay_string_compatible():
+    """Event type/mode constants behave like the plain strings callers compare to."""
+    import json
+    import sys
+
+    from ai_agent_toolbox import EventMode, EventType
+
+    events = XMLParser(tag="use_tool").parse("hi <use_tool><name>t</name></use_tool>")
+    assert [(e.type, e.mode) for e in events][:2] == [("text", "create"), ("text", "append")]
+    assert events[0].type is EventType.TEXT
+    assert events[-1].mode is EventMode.CLOSE
+    assert {"tool": 1}[events[-1].type] == 1
+    assert f"{events[0].type}/{events[0].mode}" == "text/create"
+    assert str(events[-1].type) == "tool"
+    assert json.dumps(events[0].mode) == '"create"'
+    if sys.version_info >= (3, 10):
+        assert not hasattr(events[0], "__dict__")
+        assert not hasattr(events[-1].tool, "__dict__")